@@ -1,5 +1,7 @@
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, Request, request, jsonify, send_from_directory, send_file
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, DDL
+from sqlalchemy.orm import Session as SQLAlchemySession
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity, verify_jwt_in_request
 from flask_cors import CORS, cross_origin
@@ -9,9 +11,45 @@ try:
 except ImportError:
     MAIL_AVAILABLE = False
     print("⚠️ Flask-Mail not available - email notifications disabled")
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("⚠️ orjson not available - using the standard library JSON encoder")
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    print("⚠️ Brotli not available - API responses are compressed with gzip only")
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
+from werkzeug.utils import secure_filename
+from datetime import date, datetime, timedelta
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import reduce
 import os
+import csv
+import io
+import uuid
+import hashlib
+import tempfile
+import gzip
+import mimetypes
+import json
+import base64
+import time
+import shutil
+import itertools
+import codecs
+import threading
 from dotenv import load_dotenv
 import pytz
 
@@ -22,7 +60,20 @@ load_dotenv()
 static_folder = 'build' if os.path.exists('build') else '../frontend/build'
 if not os.path.exists(static_folder):
     static_folder = None
+
+class UploadRequest(Request):
+    """Spools uploaded files to memory when small and to a temporary file otherwise. Both are
+    seekable, unlike SpooledTemporaryFile before Python 3.11, so Excel readers can use the upload
+    stream directly instead of reading it into memory."""
+    max_memory_file_size = 500 * 1024
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= self.max_memory_file_size:
+            return io.BytesIO()
+        return tempfile.TemporaryFile('rb+')
+
 app = Flask(__name__, static_folder=static_folder, static_url_path='' if static_folder else None)
+app.request_class = UploadRequest
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
 # Database configuration - PostgreSQL only
@@ -44,6 +95,39 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_pre_ping': True,
     'max_overflow': 30
 }
+# Rows buffered in memory before each flush to the upload staging table
+app.config['UPLOAD_BATCH_SIZE'] = int(os.getenv('UPLOAD_BATCH_SIZE', 5000))
+# Phone normalization - numbers are stored without country code or trunk prefix
+app.config['PHONE_COUNTRY_CODE'] = os.getenv('PHONE_COUNTRY_CODE', '91')
+app.config['PHONE_NATIONAL_LENGTH'] = int(os.getenv('PHONE_NATIONAL_LENGTH', 10))
+# Processes used to parse multi-file uploads in parallel
+app.config['UPLOAD_PARSE_WORKERS'] = int(os.getenv('UPLOAD_PARSE_WORKERS', os.cpu_count() or 1))
+# Uploaded files wait here until the upload worker picks them up (the worker runs in the same container)
+app.config['UPLOAD_SPOOL_DIR'] = os.getenv('UPLOAD_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'crm_uploads'))
+# Seconds a job may stay running before it is treated as abandoned by a crashed worker
+app.config['UPLOAD_JOB_TIMEOUT'] = int(os.getenv('UPLOAD_JOB_TIMEOUT', 3600))
+# Rows parsed per file by an upload preview (dry run) before extrapolating to the whole file
+app.config['UPLOAD_PREVIEW_SAMPLE_ROWS'] = int(os.getenv('UPLOAD_PREVIEW_SAMPLE_ROWS', 1000))
+# Chunked (resumable) uploads - default and maximum chunk size in bytes
+app.config['UPLOAD_CHUNK_SIZE'] = int(os.getenv('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+app.config['UPLOAD_MAX_CHUNK_SIZE'] = int(os.getenv('UPLOAD_MAX_CHUNK_SIZE', 64 * 1024 * 1024))
+# Seconds a chunked upload may stay unfinalized before the upload worker deletes its session and chunks
+app.config['UPLOAD_SESSION_TTL'] = int(os.getenv('UPLOAD_SESSION_TTL', 24 * 3600))
+# Seconds a listing's approximate total is reused across cursor pages
+app.config['PAGINATION_TOTAL_TTL'] = int(os.getenv('PAGINATION_TOTAL_TTL', 60))
+# Seconds a caller's visit notifications are reused between polls (record and visit writes clear them sooner)
+app.config['VISIT_NOTIFICATIONS_TTL'] = int(os.getenv('VISIT_NOTIFICATIONS_TTL', 60))
+# App cache for reports - shared through Redis when CACHE_REDIS_URL is set, otherwise in-process
+# with tag versions in the database (cache_tags) so every process sees the others' invalidations
+app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL')
+app.config['CACHE_DEFAULT_TTL'] = int(os.getenv('CACHE_DEFAULT_TTL', 60))
+app.config['CACHE_MAX_ENTRIES'] = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+# Shorter search terms are ignored (trigram indexes need at least 3 characters)
+app.config['SEARCH_MIN_TERM_LENGTH'] = int(os.getenv('SEARCH_MIN_TERM_LENGTH', 3))
+# Largest number of items accepted by PATCH /api/records/batch
+app.config['RECORD_BATCH_MAX_ITEMS'] = int(os.getenv('RECORD_BATCH_MAX_ITEMS', 500))
+# Smaller responses are sent uncompressed (compression would not save a round trip)
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
 
 # Email configuration
 app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
@@ -53,9 +137,37 @@ app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', os.getenv('MAIL_USERNAME'))
 
+# JSON responses - orjson when installed. Datetimes serialize as ISO 8601 either way,
+# so endpoints can return them as-is instead of calling .isoformat() per row
+class FastJSONProvider(DefaultJSONProvider):
+    sort_keys = False
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+    
+    def dumps(self, obj, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+        return super().dumps(obj, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        if not ORJSON_AVAILABLE:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
+
+app.json = FastJSONProvider(app)
+
 # Initialize extensions
 db = SQLAlchemy()
-migrate = Migrate()
+# Versioned schema migrations live in backend/migrations (flask db upgrade)
+migrate = Migrate(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
 jwt = JWTManager()
 if MAIL_AVAILABLE:
     mail = Mail()
@@ -103,6 +215,7 @@ class Record(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     caller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     phone_number = db.Column(db.String(20), nullable=False)
+    phone_normalized = db.Column(db.String(20), unique=True, index=True)  # Canonical form, see normalize_phone_numbers
     name = db.Column(db.String(100))
     response = db.Column(db.Text)
     notes = db.Column(db.Text)
@@ -111,6 +224,49 @@ class Record(db.Model):
     hidden_from_caller = db.Column(db.Boolean, default=False)
     assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Optimistic concurrency, see versioned_update
+    upload_job_id = db.Column(db.String(36), nullable=True)  # Upload job that inserted the record, see forget_upload_fingerprints
+    
+    # Hot path indexes - keep in sync with backend/migrations/versions
+    __table_args__ = (
+        db.Index('ix_records_caller_hidden_visit', 'caller_id', 'hidden_from_caller', 'visit'),
+        db.Index('ix_records_updated_at', 'updated_at'),
+        # Trigram indexes for ILIKE '%term%' search (PostgreSQL only, see search_records)
+        db.Index('ix_records_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_records_phone_number_trgm', 'phone_number', postgresql_using='gin', postgresql_ops={'phone_number': 'gin_trgm_ops'}),
+    )
+
+# The trigram indexes need pg_trgm when tables are created with db.create_all()
+event.listen(
+    Record.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
+class CallerDailyStats(db.Model):
+    """Per caller per day rollup of records, kept in step with every record write (see apply_daily_stats)
+    so progress and history read a few rows instead of counting records"""
+    __tablename__ = 'caller_daily_stats'
+    caller_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)  # UTC, like Record.updated_at
+    responses = db.Column(db.Integer, nullable=False, default=0)  # Records with a response last updated that day
+    assigned = db.Column(db.Integer, nullable=False, default=0)  # Records assigned that day
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class CallEvent(db.Model):
+    """Append-only log of response changes - one row per call outcome a caller records.
+    Rows are never updated or deleted, so record_id has no foreign key and outlives the record."""
+    __tablename__ = 'call_events'
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    record_id = db.Column(db.Integer, nullable=False, index=True)
+    caller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Who made the change
+    old_response = db.Column(db.Text)
+    new_response = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Events arrive in time order, so a BRIN index covers time range scans at a fraction of a B-tree's size
+    __table_args__ = (
+        db.Index('ix_call_events_created_at', 'created_at', postgresql_using='brin'),
+    )
 
 class Task(db.Model):
     __tablename__ = 'tasks'
@@ -124,6 +280,11 @@ class Task(db.Model):
     progress = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    
+    __table_args__ = (
+        db.Index('ix_tasks_assigned_status', 'assigned_to', 'status'),
+    )
 
 class CertifiedOfficeAssistant(db.Model):
     __tablename__ = 'certified_office_assistant'
@@ -164,6 +325,7 @@ class OtherAdmissions(db.Model):
     source_of_reach = db.Column(db.String(200), nullable=True)  # How they found us
     processed_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
 class Admission(db.Model):
     __tablename__ = 'admissions'
@@ -190,6 +352,10 @@ class Reminder(db.Model):
     # Relationships
     record = db.relationship('Record', backref='reminders')
     caller = db.relationship('User', backref='reminders')
+    
+    __table_args__ = (
+        db.Index('ix_reminders_caller_active', 'caller_id', 'is_active'),
+    )
 
 class ReminderQueue(db.Model):
     __tablename__ = 'reminder_queue'
@@ -203,75 +369,214 @@ class ReminderQueue(db.Model):
     # Relationships
     reminder = db.relationship('Reminder', backref='queue_items')
     caller = db.relationship('User', backref='reminder_queue')
+    
+    __table_args__ = (
+        db.Index('ix_reminder_queue_caller_dismissed', 'caller_id', 'is_dismissed'),
+    )
+
+class UploadStaging(db.Model):
+    __tablename__ = 'upload_staging'
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.String(36), nullable=False, index=True)  # One batch per uploaded file
+    seq = db.Column(db.Integer, nullable=False)  # Row order within the file
+    phone_number = db.Column(db.String(20), nullable=False)
+    phone_normalized = db.Column(db.String(20), nullable=False)
+    name = db.Column(db.String(100))
+
+class UploadJob(db.Model):
+    __tablename__ = 'upload_jobs'
+    id = db.Column(db.String(36), primary_key=True)
+    status = db.Column(db.Enum('queued', 'running', 'completed', 'failed', name='upload_job_status'), default='queued')
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    distribution_type = db.Column(db.String(20), default='equal')
+    caller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    caller_weights = db.Column(db.Text)  # Optional JSON {caller_id: weight} for backlog-based distribution
+    files = db.Column(db.Text, nullable=False)  # JSON list of {filename, path} in the spool dir
+    rows_parsed = db.Column(db.Integer, default=0)
+    records_added = db.Column(db.Integer, default=0)
+    skipped_duplicates = db.Column(db.Integer, default=0)
+    file_results = db.Column(db.Text)  # JSON list of per-file results
+    result = db.Column(db.Text)  # JSON summary once completed
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+class UploadSession(db.Model):
+    """A resumable chunked upload of one file - chunks are kept in the spool dir until finalized
+    (or deleted with the session once UPLOAD_SESSION_TTL passes, see expire_upload_sessions)"""
+    __tablename__ = 'upload_sessions'
+    id = db.Column(db.String(36), primary_key=True)
+    status = db.Column(db.Enum('open', 'finalized', name='upload_session_status'), default='open')
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    total_size = db.Column(db.BigInteger, nullable=False)
+    chunk_size = db.Column(db.Integer, nullable=False)
+    total_chunks = db.Column(db.Integer, nullable=False)
+    checksum = db.Column(db.String(64))  # Optional SHA-256 of the whole file, checked on finalize
+    distribution_type = db.Column(db.String(20), default='equal')
+    caller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    caller_weights = db.Column(db.Text)
+    job_id = db.Column(db.String(36), db.ForeignKey('upload_jobs.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class UploadFingerprint(db.Model):
+    """Content hash and column mapping of every processed upload file, so re-uploads can be skipped"""
+    __tablename__ = 'upload_fingerprints'
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False, index=True)  # SHA-256 of the whole file
+    size = db.Column(db.BigInteger, nullable=False)
+    file_ext = db.Column(db.String(10), nullable=False)
+    columns = db.Column(db.Text)  # JSON list of the detected header
+    phone_column = db.Column(db.String(255))
+    name_column = db.Column(db.String(255))
+    rows_parsed = db.Column(db.Integer, default=0)  # Cumulative, including any earlier prefix
+    records_found = db.Column(db.Integer, default=0)
+    job_id = db.Column(db.String(36), db.ForeignKey('upload_jobs.id'))
+    previous_id = db.Column(db.Integer, db.ForeignKey('upload_fingerprints.id'))  # The file this one appended rows to
+    result = db.Column(db.Text)  # JSON per-file result of the job that processed it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class CacheTag(db.Model):
+    """Version of each app cache tag when the cache is in-process, shared through the database so
+    writes committed by any process (the upload worker, other web workers) invalidate every cache"""
+    __tablename__ = 'cache_tags'
+    tag = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Response compression
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'text/html', 'text/css', 'text/plain', 'text/csv', 'image/svg+xml'
+}
+
+def negotiate_encoding(available):
+    """The content coding from `available` the client prefers (ties go to the first listed), or None"""
+    accepted = [encoding for encoding in available if request.accept_encodings.quality(encoding) > 0]
+    if not accepted:
+        return None
+    return max(accepted, key=request.accept_encodings.quality)
+
+@app.after_request
+def compress_response(response):
+    """Brotli or gzip for API responses above COMPRESS_MIN_SIZE. File responses are left alone -
+    the frontend build ships precompressed (see send_frontend_file)."""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    encoding = negotiate_encoding(['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip'])
+    if encoding == 'br':
+        # Quality 5 is most of brotli's gain at a fraction of the CPU of the default 11
+        response.set_data(brotli.compress(data, quality=5))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(data, compresslevel=6))
+    else:
+        return response
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def send_frontend_file(path):
+    """Serve a file from the React build, using the .br/.gz copy written by `npm run build` when the
+    client accepts it. Content-hashed files under static/ are cached for good; everything else
+    (index.html, favicon) is revalidated so a new deploy is picked up."""
+    full_path = safe_join(app.static_folder, path)
+    immutable = path.startswith('static/')
+    # send_file marks responses no-cache unless given a max_age
+    max_age = 31536000 if immutable else None
+    precompressed = {
+        encoding: path + extension for encoding, extension in (('br', '.br'), ('gzip', '.gz'))
+        if full_path and os.path.isfile(full_path + extension)
+    }
+    encoding = negotiate_encoding(list(precompressed))
+    
+    if encoding:
+        response = send_from_directory(
+            app.static_folder, precompressed[encoding], mimetype=mimetypes.guess_type(path)[0], max_age=max_age
+        )
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(app.static_folder, path, max_age=max_age)
+    if precompressed:
+        response.vary.add('Accept-Encoding')
+    if immutable:
+        response.cache_control.immutable = True
+    return response
 
 # Frontend Routes - MUST BE FIRST
 @app.route('/')
 def serve_frontend():
     print("ROOT ROUTE HIT")
     if app.static_folder and os.path.exists(os.path.join(app.static_folder, 'index.html')):
-        return send_from_directory(app.static_folder, 'index.html')
+        return send_frontend_file('index.html')
     return jsonify({'message': 'CRM API is running', 'status': 'ok', 'note': 'Frontend not deployed'}), 200
 
 @app.route('/favicon.ico')
 def favicon():
     print("FAVICON ROUTE HIT")
-    return send_from_directory(app.static_folder, 'favicon.ico')
+    return send_frontend_file('favicon.ico')
 
 # React Router routes - MUST BE AFTER API ROUTES
 @app.route('/login')
 def serve_login():
     print(f"LOGIN ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/admin')
 def serve_admin():
     print(f"ADMIN ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/admin/<path:subpath>')
 def serve_admin_subpaths(subpath):
     print(f"ADMIN SUBPATH ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/caller')
 def serve_caller():
     print(f"CALLER ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/caller/<path:subpath>')
 def serve_caller_subpaths(subpath):
     print(f"CALLER SUBPATH ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/custom')
 def serve_custom():
     print(f"CUSTOM ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/custom/<path:subpath>')
 def serve_custom_subpaths(subpath):
     print(f"CUSTOM SUBPATH ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/supervisor')
 def serve_supervisor():
     print(f"SUPERVISOR ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/supervisor/<path:subpath>')
 def serve_supervisor_subpaths(subpath):
     print(f"SUPERVISOR SUBPATH ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/tasks')
 def serve_tasks():
     print(f"TASKS ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 @app.route('/tasks/<path:subpath>')
 def serve_tasks_subpaths(subpath):
     print(f"TASKS SUBPATH ROUTE HIT: {request.path}")
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_frontend_file('index.html')
 
 
 
@@ -383,10 +688,1391 @@ def test_auth():
         'user_name': user.name if user else 'Unknown'
     })
 
+# Daily caller stats helpers
+def new_daily_stats_deltas():
+    """Changes to caller_daily_stats collected during a request: {(caller_id, date): Counter}"""
+    return defaultdict(Counter)
+
+def add_response_delta(deltas, caller_id, updated_at, response, sign):
+    """Count (sign=1) or uncount (sign=-1) a record as a response of its caller on the day it was last updated"""
+    if caller_id and updated_at and response:
+        deltas[(caller_id, updated_at.date())]['responses'] += sign
+
+def add_assigned_delta(deltas, caller_id, assigned_at, count):
+    if caller_id and assigned_at:
+        deltas[(caller_id, assigned_at.date())]['assigned'] += count
+
+def add_record_deltas(deltas, record, sign):
+    """Count or uncount everything a record contributes to the rollup (used when records are created or deleted)"""
+    add_response_delta(deltas, record.caller_id, record.updated_at, record.response, sign)
+    add_assigned_delta(deltas, record.caller_id, record.assigned_at or record.updated_at, sign)
+
+def apply_daily_stats(deltas):
+    """Fold deltas into caller_daily_stats with one upsert. Runs in the current transaction,
+    so the rollup commits or rolls back together with the record writes it describes."""
+    rows = [
+        {'caller_id': caller_id, 'date': day, 'responses': counts['responses'], 'assigned': counts['assigned'],
+         'updated_at': datetime.utcnow()}
+        for (caller_id, day), counts in deltas.items()
+        if counts['responses'] or counts['assigned']
+    ]
+    if not rows:
+        return
+    
+    stats = CallerDailyStats.__table__
+    statement = dialect_insert(stats)
+    statement = statement.on_conflict_do_update(
+        index_elements=['caller_id', 'date'],
+        set_={
+            'responses': stats.c.responses + statement.excluded.responses,
+            'assigned': stats.c.assigned + statement.excluded.assigned,
+            'updated_at': statement.excluded.updated_at
+        }
+    )
+    db.session.execute(statement, rows)
+
+def log_call_event(events, record_id, caller_id, old_response, new_response, now):
+    """Queue a call_events row when a write changes a record's response"""
+    if (old_response or '') != (new_response or ''):
+        events.append({
+            'record_id': record_id, 'caller_id': caller_id,
+            'old_response': old_response, 'new_response': new_response, 'created_at': now
+        })
+
+def touch_record(record, now):
+    """Set a loaded record's updated_at (on visit changes), moving its response to today's stats"""
+    deltas = new_daily_stats_deltas()
+    add_response_delta(deltas, record.caller_id, record.updated_at, record.response, -1)
+    add_response_delta(deltas, record.caller_id, now, record.response, 1)
+    apply_daily_stats(deltas)
+    record.updated_at = now
+
+# Optimistic concurrency helpers
+def get_expected_version(data):
+    """Version a client echoed back with an update, or None if it sent none (unconditional update)"""
+    version = data.get('version')
+    if version is not None and (isinstance(version, bool) or not isinstance(version, int)):
+        raise ValueError('version must be an integer')
+    return version
+
+def versioned_update(model, row_id, expected_version, values):
+    """UPDATE ... SET values, version = version + 1 WHERE id = ? [AND version = ?], without locking.
+    Returns the new version, or None when the row changed since the client read it."""
+    statement = db.update(model).where(model.id == row_id)
+    if expected_version is not None:
+        statement = statement.where(model.version == expected_version)
+    statement = statement.values(**values, version=model.version + 1) \
+        .execution_options(synchronize_session=False)
+    
+    if db.engine.dialect.update_returning:
+        return db.session.execute(statement.returning(model.version)).scalar()
+    if db.session.execute(statement).rowcount != 1:
+        return None
+    return db.session.query(model.version).filter(model.id == row_id).scalar()
+
+def fetch_dicts(statement):
+    """Rows of a column SELECT as plain dicts keyed by column label - no ORM objects are built"""
+    return [row._asdict() for row in db.session.execute(statement)]
+
+def model_to_dict(instance):
+    return {
+        column.key: value.isoformat() if isinstance(value, datetime) else value
+        for column in instance.__table__.columns
+        for value in [getattr(instance, column.key)]
+    }
+
+def version_conflict_response(instance, label):
+    """409 carrying the row as it is now, so the client can merge or retry"""
+    db.session.rollback()
+    db.session.refresh(instance)
+    return jsonify({
+        'message': f'{label} was changed by someone else. Review the latest version and try again.',
+        'current': model_to_dict(instance)
+    }), 409
+
+# Conditional GET helpers
+def get_list_etag(*state):
+    """ETag of a listing: the requesting user, path and query parameters plus cheap aggregates
+    (e.g. max updated_at and row count) that change whenever the listed rows do"""
+    raw = repr((request.path, get_jwt_identity(), sorted(request.args.items(multi=True)), state))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+def not_modified_response(etag):
+    """304 response when the client's cached copy is still current, otherwise None.
+    Only the ETag is compared - a max updated_at alone misses deleted and reassigned rows,
+    so no Last-Modified is sent and If-Modified-Since is ignored."""
+    if not request.if_none_match or not request.if_none_match.contains_weak(etag):
+        return None
+    return add_cache_validators(app.response_class(status=304), etag)
+
+def add_cache_validators(response, etag):
+    """Attach the ETag and make the browser revalidate before reusing the response"""
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+# Keyset pagination helpers
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key of the last row on a page"""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """Sort key values from a cursor, typed like the key columns. Raises ValueError if malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor')
+    typed_values = []
+    for column, value in zip(columns, values):
+        # A well-formed cursor can still hold values of the wrong type, e.g. [1, 2] for (updated_at, id)
+        if isinstance(column.type, db.DateTime) and value is not None:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise ValueError('Invalid cursor')
+        elif isinstance(value, (bool, list, dict)) or (isinstance(column.type, db.Integer) and not isinstance(value, int)):
+            raise ValueError('Invalid cursor')
+        typed_values.append(value)
+    return typed_values
+
+def keyset_page(query, columns, key, cursor=None, per_page=50, descending=False):
+    """Fetch the page after a cursor by seeking on a unique sort key (e.g. (updated_at, id)),
+    so every page costs the same as the first. key(row) returns the row's sort key values.
+    Returns (rows, next_cursor); next_cursor is None on the last page."""
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        if descending:
+            query = query.filter(db.tuple_(*columns) < db.tuple_(*values))
+        else:
+            query = query.filter(db.tuple_(*columns) > db.tuple_(*values))
+    
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+    rows = query.limit(per_page + 1).all()
+    
+    next_cursor = encode_cursor(key(rows[per_page - 1])) if len(rows) > per_page else None
+    return rows[:per_page], next_cursor
+
+def approximate_total(cache_key, query):
+    """Row count of a listing, kept in the app cache for PAGINATION_TOTAL_TTL seconds so paging
+    does not re-count on every request. Untagged, so it may be slightly stale."""
+    key = f"approximate_total:{hashlib.md5(repr(cache_key).encode()).hexdigest()}"
+    total = app_cache.get_or_compute(
+        'approximate_total', key, [], lambda: str(query.order_by(None).count()).encode(),
+        app.config['PAGINATION_TOTAL_TTL']
+    )
+    return int(total)
+
+# Application cache
+class LocalCacheBackend:
+    """In-process LRU with per-entry expiry. Tag versions live in the cache_tags table rather than in
+    the process, so an entry computed here still misses after another process commits a write."""
+    name = 'local'
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+            if entry[1] <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+    
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (value, time.time() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    # Own connections, so tag reads and bumps stay out of the request's transaction (and its cache events)
+    def tag_versions(self, tags):
+        with db.engine.connect() as connection:
+            versions = dict(connection.execute(
+                db.select(CacheTag.tag, CacheTag.version).where(CacheTag.tag.in_(tags))
+            ).all())
+        return [versions.get(tag, 0) for tag in tags]
+    
+    def bump_tags(self, tags):
+        cache_tags = CacheTag.__table__
+        statement = dialect_insert(cache_tags).values([{'tag': tag, 'version': 1} for tag in tags])
+        statement = statement.on_conflict_do_update(
+            index_elements=['tag'], set_={'version': cache_tags.c.version + 1}
+        )
+        with db.engine.begin() as connection:
+            connection.execute(statement)
+    
+    def size(self):
+        return len(self.entries)
+
+class RedisCacheBackend:
+    """Shared cache in Redis (or anything speaking its protocol), so every worker sees the same
+    entries and invalidations. Entries are stored as '<tag versions JSON>\n<body>'."""
+    name = 'redis'
+    prefix = 'crm:cache:'
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        versions, body = raw.split(b'\n', 1)
+        return json.loads(versions), body
+    
+    def set(self, key, value, ttl):
+        versions, body = value
+        self.client.set(self.prefix + key, json.dumps(versions).encode() + b'\n' + body, ex=ttl)
+    
+    def tag_versions(self, tags):
+        return [int(version or 0) for version in self.client.mget([self.prefix + 'tag:' + tag for tag in tags])]
+    
+    def bump_tags(self, tags):
+        pipeline = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipeline.incr(self.prefix + 'tag:' + tag)
+        pipeline.execute()
+    
+    def size(self):
+        return None
+
+class AppCache:
+    """Response cache keyed by endpoint and parameters. Each entry remembers the versions of its tags
+    when it was computed; invalidating a tag bumps its version, so every entry carrying it misses.
+    Backend errors are logged and treated as misses - the cache never takes a request down."""
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self.counts = defaultdict(Counter)
+    
+    def get_or_compute(self, name, key, tags, compute, ttl):
+        try:
+            entry = self.backend.get(key)
+            versions = self.backend.tag_versions(tags) if tags else []
+        except Exception as e:
+            print(f"⚠️ Cache read failed for {name}: {str(e)}", flush=True)
+            self.counts[name]['errors'] += 1
+            return compute()
+        
+        if entry and list(entry[0]) == versions:
+            self.counts[name]['hits'] += 1
+            return entry[1]
+        
+        self.counts[name]['misses'] += 1
+        # Versions read before computing: an invalidation that lands meanwhile makes this entry miss next time
+        value = compute()
+        try:
+            self.backend.set(key, (versions, value), ttl)
+        except Exception as e:
+            print(f"⚠️ Cache write failed for {name}: {str(e)}", flush=True)
+            self.counts[name]['errors'] += 1
+        return value
+    
+    def invalidate(self, *tags):
+        if not tags:
+            return
+        try:
+            self.backend.bump_tags(sorted(tags))
+        except Exception as e:
+            print(f"⚠️ Cache invalidation failed for {', '.join(sorted(tags))}: {str(e)}", flush=True)
+    
+    def stats(self):
+        def summary(counts):
+            lookups = counts['hits'] + counts['misses']
+            return {
+                'hits': counts['hits'],
+                'misses': counts['misses'],
+                'errors': counts['errors'],
+                'hit_rate': round(counts['hits'] / lookups * 100, 2) if lookups else None
+            }
+        
+        total = sum(self.counts.values(), Counter())
+        return {
+            'backend': self.backend.name,
+            'entries': self.backend.size(),
+            'overall': summary(total),
+            'endpoints': {name: summary(counts) for name, counts in sorted(self.counts.items())}
+        }
+
+def create_app_cache():
+    redis_url = app.config['CACHE_REDIS_URL']
+    if redis_url:
+        if REDIS_AVAILABLE:
+            print("🗄️ App cache: Redis", flush=True)
+            return AppCache(RedisCacheBackend(redis.Redis.from_url(redis_url, socket_timeout=1)))
+        print("⚠️ CACHE_REDIS_URL is set but the redis package is not installed - using the in-process cache")
+    return AppCache(LocalCacheBackend(app.config['CACHE_MAX_ENTRIES']))
+
+app_cache = create_app_cache()
+
+def cached_json(name, tags, compute, key_parts=(), ttl=None):
+    """JSON response for compute() from the app cache. The key is name plus the request's query
+    parameters and key_parts; the serialized body is cached, so a hit skips serialization too."""
+    params = repr((sorted(request.args.items(multi=True)), key_parts))
+    key = f"{name}:{hashlib.md5(params.encode()).hexdigest()}"
+    body = app_cache.get_or_compute(
+        name, key, tags, lambda: app.json.dumps(compute()).encode(), ttl or app.config['CACHE_DEFAULT_TTL']
+    )
+    return app.response_class(body, mimetype='application/json')
+
+# Invalidation: every table a transaction writes is a tag, bumped once the transaction commits.
+# Covers ORM flushes and insert/update/delete statements run through the session.
+# 'record_counts' is narrower than 'records': it only changes when records are added or removed,
+# gain or lose a response, or change visit status - not on every response edit.
+def mark_cache_tags(session, tables):
+    session.info.setdefault('cache_tags', set()).update(tables)
+
+def response_completion_changed(old_response, new_response):
+    """Whether a response edit moves a record in or out of the completed calls count"""
+    return bool(old_response) != bool(new_response)
+
+def record_counts_changed(record):
+    state = db.inspect(record)
+    if state.attrs.visit.history.has_changes():
+        return True
+    response = state.attrs.response.history
+    if not response.has_changes():
+        return False
+    # Without the old value (not loaded before the change) assume the count moved
+    if not response.deleted:
+        return True
+    return response_completion_changed(response.deleted[0], response.added[0] if response.added else None)
+
+@event.listens_for(SQLAlchemySession, 'before_flush')
+def collect_flushed_tables(session, flush_context, instances):
+    tables = {
+        instance.__table__.name
+        for instance in list(session.new) + list(session.dirty) + list(session.deleted)
+    }
+    if any(isinstance(instance, Record) for instance in list(session.new) + list(session.deleted)) or \
+            any(isinstance(instance, Record) and record_counts_changed(instance) for instance in session.dirty):
+        tables.add('record_counts')
+    mark_cache_tags(session, tables)
+
+@event.listens_for(SQLAlchemySession, 'do_orm_execute')
+def collect_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table.name
+        mark_cache_tags(orm_execute_state.session, {table})
+        # Updates through statements mark record_counts themselves when they change a count
+        if table == 'records' and not orm_execute_state.is_update:
+            mark_cache_tags(orm_execute_state.session, {'record_counts'})
+
+@event.listens_for(SQLAlchemySession, 'after_commit')
+def invalidate_committed_tables(session):
+    app_cache.invalidate(*session.info.pop('cache_tags', ()))
+
+@event.listens_for(SQLAlchemySession, 'after_rollback')
+def discard_cache_tags(session):
+    session.info.pop('cache_tags', None)
+
+# Visit notifications are cached per caller and cleared by the writes that change them (record and
+# visit updates), rather than by the records tag, so one caller's work doesn't evict everyone's
+def invalidate_visit_notifications(*caller_ids):
+    """Drop cached notifications of the given callers, or of everyone when called without arguments"""
+    if not caller_ids:
+        app_cache.invalidate('visit_notifications')
+    app_cache.invalidate(*[f'visit_notifications:{caller_id}' for caller_id in caller_ids])
+
+# Search helpers
+def escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def search_records(query, searches):
+    """Apply substring searches to a records query. searches is a list of (columns, term); a
+    term must match at least one of its columns. Terms shorter than SEARCH_MIN_TERM_LENGTH are
+    ignored - they cannot use a trigram index. Returns (query, score) where score is a relevance
+    expression (higher is better) or None when no term applied.
+    On PostgreSQL, ILIKE '%term%' is served by the pg_trgm GIN indexes on records
+    and relevance is trigram similarity; elsewhere relevance is exact > prefix > substring."""
+    is_postgres = db.engine.dialect.name == 'postgresql'
+    scores = []
+    for columns, term in searches:
+        term = (term or '').strip()
+        if len(term) < app.config['SEARCH_MIN_TERM_LENGTH']:
+            continue
+        
+        pattern = escape_like(term)
+        query = query.filter(db.or_(*[column.ilike(f'%{pattern}%', escape='\\') for column in columns]))
+        
+        for column in columns:
+            if is_postgres:
+                scores.append(db.func.coalesce(db.func.similarity(column, term), 0))
+            else:
+                lowered = db.func.lower(column)
+                scores.append(db.case(
+                    (lowered == term.lower(), 1.0),
+                    (lowered.like(f'{pattern.lower()}%', escape='\\'), 0.5),
+                    (lowered.like(f'%{pattern.lower()}%', escape='\\'), 0.25),
+                    else_=0.0
+                ))
+    
+    if not scores:
+        return query, None
+    return query, db.cast(reduce(lambda a, b: a + b, scores), db.Float).label('relevance')
+
+# Bulk upload helpers
+def normalize_phone_numbers(phones):
+    """Vectorized canonical form of phone numbers: digits only, without the international
+    prefix, country code or trunk '0'. "+91 98765 43210", "09876543210" and "9876543210"
+    all become "9876543210". Values without digits (or too long to be a phone) become None."""
+    import pandas as pd
+    
+    country_code = app.config['PHONE_COUNTRY_CODE']
+    national_length = app.config['PHONE_NATIONAL_LENGTH']
+    
+    digits = pd.Series(phones, dtype='object').astype(str).str.replace(r'\D', '', regex=True)
+    digits = digits.str.replace(r'^00', '', regex=True)
+    
+    lengths = digits.str.len()
+    with_country_code = (lengths == national_length + len(country_code)) & digits.str.startswith(country_code)
+    digits = digits.mask(with_country_code, digits.str[len(country_code):])
+    
+    lengths = digits.str.len()
+    with_trunk_prefix = (lengths == national_length + 1) & digits.str.startswith('0')
+    digits = digits.mask(with_trunk_prefix, digits.str[1:])
+    
+    lengths = digits.str.len()
+    return digits.where((lengths > 0) & (lengths <= 20), None).tolist()
+
+def dialect_insert(table):
+    """INSERT construct of the active dialect, for ON CONFLICT support"""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def iter_text_lines(stream, encoding='utf-8-sig', chunk_size=64 * 1024):
+    """Incrementally decode a binary stream and yield text lines (newline kept) for csv.reader"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+        if not chunk:
+            break
+    if pending:
+        yield pending
+
+def excel_column_to_strings(values):
+    """Vectorized conversion of Excel cell values to stripped strings. Whole-number floats
+    (how Excel usually stores phone numbers) lose their trailing '.0', empty cells become ''."""
+    import pandas as pd
+    
+    series = pd.Series(values, dtype='object')
+    is_number = series.map(lambda value: isinstance(value, (int, float)) and not isinstance(value, bool))
+    numbers = pd.to_numeric(series.where(is_number), errors='coerce')
+    is_whole = is_number & numbers.notna() & (numbers % 1 == 0)
+    
+    result = series.astype(str).str.strip()
+    result[is_whole] = numbers[is_whole].astype('int64').astype(str)
+    result[series.isna()] = ''
+    return result.tolist()
+
+def iter_xlsx_rows(worksheet, phone_index, name_index):
+    """Yield (phone, name) pairs from a read-only worksheet, reading only the needed column range"""
+    first = min(i for i in (phone_index, name_index) if i is not None)
+    last = max(i for i in (phone_index, name_index) if i is not None)
+    rows = worksheet.iter_rows(min_row=2, min_col=first + 1, max_col=last + 1, values_only=True)
+    
+    def cell(row, index):
+        index -= first
+        return row[index] if index < len(row) else None
+    
+    batch_size = app.config['UPLOAD_BATCH_SIZE']
+    while True:
+        chunk = list(itertools.islice(rows, batch_size))
+        if not chunk:
+            break
+        phones = excel_column_to_strings([cell(row, phone_index) for row in chunk])
+        if name_index is not None:
+            names = excel_column_to_strings([cell(row, name_index) for row in chunk])
+        else:
+            names = [''] * len(phones)
+        yield from zip(phones, names)
+
+STAGING_COLUMNS = ['batch_id', 'seq', 'phone_number', 'phone_normalized', 'name']
+
+def write_parsed_rows(batch_id, parsed_rows, output_path):
+    """Normalize (phone, name) pairs in fixed-size batches and write them as CSV in
+    upload_staging column order, so memory stays flat. Returns rows read."""
+    batch_size = app.config['UPLOAD_BATCH_SIZE']
+    
+    with open(output_path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output, quoting=csv.QUOTE_NONNUMERIC)
+        
+        def flush(batch):
+            normalized = normalize_phone_numbers([phone for _, phone, _ in batch])
+            writer.writerows(
+                [batch_id, seq, phone[:20], phone_normalized, name[:100]]
+                for (seq, phone, name), phone_normalized in zip(batch, normalized)
+                if phone_normalized
+            )
+        
+        batch = []
+        seq = 0
+        for phone, name in parsed_rows:
+            if not phone:
+                continue
+            batch.append((seq, phone, name))
+            seq += 1
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        flush(batch)
+    
+    return seq
+
+def stage_parsed_file(path):
+    """Bulk load a parsed file into upload_staging (COPY on PostgreSQL, batched multi-row INSERT elsewhere)"""
+    connection = db.session.connection()
+    with open(path, newline='', encoding='utf-8') as parsed:
+        if connection.dialect.name == 'postgresql':
+            cursor = connection.connection.cursor()
+            cursor.copy_expert(
+                f"COPY upload_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                parsed
+            )
+            return
+        
+        reader = csv.reader(parsed)
+        while True:
+            chunk = list(itertools.islice(reader, app.config['UPLOAD_BATCH_SIZE']))
+            if not chunk:
+                break
+            db.session.execute(UploadStaging.__table__.insert(), [{
+                'batch_id': batch_id,
+                'seq': int(seq),
+                'phone_number': phone,
+                'phone_normalized': phone_normalized,
+                'name': name
+            } for batch_id, seq, phone, phone_normalized, name in chunk])
+
+def json_array_item(json_array, index):
+    """SQL expression for the integer json_array[index], json_array being a JSON text literal"""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import JSONB
+        return db.cast(db.cast(db.literal(json_array), JSONB).op('->>')(index), db.Integer)
+    return db.cast(
+        db.func.json_extract(db.literal(json_array), db.literal('$[') + db.cast(index, db.Text) + db.literal(']')),
+        db.Integer
+    )
+
+def get_caller_backlogs(caller_ids):
+    """Open (not yet responded) records per caller, in one grouped query"""
+    rows = db.session.query(Record.caller_id, db.func.count(Record.id)).filter(
+        Record.caller_id.in_(caller_ids),
+        Record.hidden_from_caller.is_(False),
+        db.or_(Record.response.is_(None), Record.response == '')
+    ).group_by(Record.caller_id).all()
+    
+    backlog = dict.fromkeys(caller_ids, 0)
+    backlog.update({caller_id: count for caller_id, count in rows})
+    return backlog
+
+def plan_caller_assignment(count, backlog, weights=None):
+    """Spread `count` new records over callers so that backlog / weight evens out (water-filling),
+    computed in one vectorized pass. Returns the caller id for every slot, interleaved so each
+    caller's share is spread over the whole batch. Ties go to the caller listed first."""
+    import numpy as np
+    
+    caller_ids = np.array(list(backlog.keys()))
+    if count <= 0 or len(caller_ids) == 0:
+        return np.array([], dtype=int)
+    
+    load = np.array([backlog[c] for c in caller_ids], dtype=float)
+    weight = np.array([(weights or {}).get(c, 1.0) for c in caller_ids], dtype=float)
+    
+    # Fill callers in order of load per unit of weight until `count` records are used up:
+    # with the k least loaded callers active, the common level is (count + their load) / their weight
+    order = np.argsort(load / weight, kind='stable')
+    level_needed = (load / weight)[order]
+    levels = (count + np.cumsum(load[order])) / np.cumsum(weight[order])
+    active = np.flatnonzero(levels >= level_needed)[-1] + 1
+    level = levels[active - 1]
+    
+    share = np.zeros(len(caller_ids))
+    share[order[:active]] = level * weight[order[:active]] - load[order[:active]]
+    
+    # Round down, then hand the remaining records to the largest fractional parts
+    quota = np.floor(share).astype(int)
+    remainder = count - quota.sum()
+    if remainder > 0:
+        quota[np.argsort(-(share - quota), kind='stable')[:remainder]] += 1
+    
+    # Interleave: the k-th record of a caller with quota q sits at position (k + 0.5) / q
+    owner = np.repeat(np.arange(len(caller_ids)), quota)
+    offset = np.arange(count) - np.repeat(np.cumsum(quota) - quota, quota)
+    position = (offset + 0.5) / quota[owner]
+    return caller_ids[owner[np.argsort(position, kind='stable')]]
+
+def insert_staged_records(batch_id, assignment, job_id=None):
+    """Insert the first occurrence of each staged phone that is not in records yet.
+    Duplicates are resolved on the unique phone_normalized index (ON CONFLICT DO NOTHING),
+    which also keeps concurrent uploads from inserting the same number twice.
+    assignment holds 'backlog' (caller id -> open records) and optional 'weights'; backlog is
+    updated with the records handed out. New records are tagged with job_id.
+    Returns (unique rows in the file, rows inserted)."""
+    staging = UploadStaging.__table__
+    records = Record.__table__
+    now = datetime.utcnow()
+
+    # First occurrence of each phone number within the file
+    first_seen = db.select(
+        staging.c.phone_normalized,
+        db.func.min(staging.c.seq).label('first_seq')
+    ).where(staging.c.batch_id == batch_id).group_by(staging.c.phone_normalized).subquery()
+
+    records_found = db.session.execute(
+        db.select(db.func.count()).select_from(first_seen)
+    ).scalar()
+
+    # Rows that are new to records, numbered in file order
+    new_rows = db.select(
+        staging.c.phone_number,
+        staging.c.phone_normalized,
+        staging.c.name,
+        staging.c.seq,
+        (db.func.row_number().over(order_by=staging.c.seq) - 1).label('slot')
+    ).join(
+        first_seen, staging.c.seq == first_seen.c.first_seq
+    ).where(
+        staging.c.batch_id == batch_id,
+        ~db.exists().where(records.c.phone_normalized == staging.c.phone_normalized)
+    ).subquery()
+
+    new_count = db.session.execute(
+        db.select(db.func.count()).select_from(new_rows)
+    ).scalar()
+
+    # Assign to callers so their pending work evens out
+    caller_for_slot = plan_caller_assignment(new_count, assignment['backlog'], assignment.get('weights'))
+    for caller_id in caller_for_slot.tolist():
+        assignment['backlog'][caller_id] += 1
+
+    survivors = db.select(
+        json_array_item(json.dumps(caller_for_slot.tolist()), new_rows.c.slot),
+        new_rows.c.phone_number,
+        new_rows.c.phone_normalized,
+        new_rows.c.name,
+        db.literal(False),
+        db.literal('pending', records.c.visit.type),
+        db.literal(now),
+        db.literal(now),
+        db.literal(job_id, records.c.upload_job_id.type)
+    ).order_by(new_rows.c.seq)
+
+    inserted_callers = db.session.execute(dialect_insert(records).from_select(
+        ['caller_id', 'phone_number', 'phone_normalized', 'name', 'hidden_from_caller', 'visit', 'assigned_at', 'updated_at', 'upload_job_id'],
+        survivors
+    ).on_conflict_do_nothing(index_elements=['phone_normalized']).returning(records.c.caller_id)).scalars().all()
+
+    # New records count towards each caller's assignments for today
+    deltas = new_daily_stats_deltas()
+    for caller_id in inserted_callers:
+        add_assigned_delta(deltas, caller_id, now, 1)
+    apply_daily_stats(deltas)
+
+    # Staging rows are only needed for the duration of the upload
+    db.session.execute(staging.delete().where(staging.c.batch_id == batch_id))
+
+    return records_found, len(inserted_callers)
+
+# Upload job processing
+PHONE_COLUMN_NAMES = ['phone', 'mobile', 'number', 'contact', 'cell', 'telephone']
+NAME_COLUMN_NAMES = ['name', 'customer', 'client', 'person', 'full_name', 'firstname']
+ALLOWED_UPLOAD_EXTENSIONS = ['.csv', '.xlsx', '.xls']
+
+# Smart column detection
+def find_column(columns, possible_names):
+    columns_lower = [str(col).lower().strip() for col in columns]
+    for possible in possible_names:
+        for i, col in enumerate(columns_lower):
+            if col and (possible.lower() in col or col in possible.lower()):
+                return columns[i]
+    return None
+
+def upload_file_error(filename, message):
+    return {
+        'filename': filename,
+        'status': 'error',
+        'message': message
+    }
+
+def count_csv_rows(source):
+    """Fast data row estimate for a CSV: newline count of the raw bytes minus the header"""
+    stream = open(source, 'rb') if isinstance(source, str) else source
+    try:
+        stream.seek(0)
+        newlines = 0
+        last = b''
+        for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+            newlines += chunk.count(b'\n')
+            last = chunk
+        if last and not last.endswith(b'\n'):
+            newlines += 1
+        return max(newlines - 1, 0)
+    finally:
+        if isinstance(source, str):
+            stream.close()
+
+def open_upload_file(filename, source, max_rows=None):
+    """Open a CSV/Excel upload (a path or binary file object) for streaming and detect its columns.
+    Returns (opened, error): opened has columns, phone_col, name_col, rows (an iterator of
+    (phone, name) pairs), count_rows() and close(); error is a per-file error result.
+    max_rows caps the rows a caller will read - .xls sheets cannot be streamed, so only that
+    many rows are loaded."""
+    file_ext = os.path.splitext(filename)[1].lower()
+    
+    # Process file based on extension
+    if file_ext == '.csv':
+        print(f"📄 Processing CSV file: {filename}", flush=True)
+        
+        # Decode incrementally from the file instead of reading it whole
+        stream = open(source, 'rb') if isinstance(source, str) else source
+        csv_reader = csv.DictReader(iter_text_lines(stream))
+        try:
+            columns = csv_reader.fieldnames or []
+        except Exception as e:
+            stream.close()
+            return None, upload_file_error(filename, f'Error reading file: {str(e)}')
+        
+        print(f"📋 CSV columns: {columns}", flush=True)
+        
+        phone_col = find_column(columns, PHONE_COLUMN_NAMES)
+        name_col = find_column(columns, NAME_COLUMN_NAMES)
+        
+        rows = (
+            (str(row.get(phone_col) or '').strip(),
+             str(row.get(name_col) or '').strip() if name_col else '')
+            for row in csv_reader
+        )
+        count_rows = lambda: count_csv_rows(source)
+        close = stream.close
+    elif file_ext == '.xlsx':
+        print(f"📄 Processing Excel file: {filename}", flush=True)
+        try:
+            from openpyxl import load_workbook
+            
+            # Read-only mode streams rows from the sheet instead of loading it whole
+            workbook = load_workbook(source, read_only=True, data_only=True)
+            worksheet = workbook.active
+            header = next(worksheet.iter_rows(max_row=1, values_only=True), ())
+            columns = [str(col).strip() if col is not None else '' for col in header]
+        except ImportError:
+            return None, upload_file_error(filename, 'Excel support not available')
+        except Exception as e:
+            return None, upload_file_error(filename, f'Error reading file: {str(e)}')
+        
+        phone_col = find_column(columns, PHONE_COLUMN_NAMES)
+        name_col = find_column(columns, NAME_COLUMN_NAMES)
+        
+        rows = iter_xlsx_rows(
+            worksheet,
+            columns.index(phone_col),
+            columns.index(name_col) if name_col else None
+        ) if phone_col else iter(())
+        # The sheet dimension gives the row count without reading the rows
+        count_rows = lambda: max((worksheet.max_row or 1) - 1, 0)
+        close = workbook.close
+    else:
+        try:
+            import pandas as pd
+            
+            # Read the header first so only the phone and name columns get loaded
+            excel_file = pd.ExcelFile(source)
+            columns = excel_file.parse(nrows=0).columns.tolist()
+            phone_col = find_column(columns, PHONE_COLUMN_NAMES)
+            name_col = find_column(columns, NAME_COLUMN_NAMES)
+            
+            phones, names = [], []
+            if phone_col:
+                df = excel_file.parse(usecols=[col for col in (phone_col, name_col) if col], dtype=object, nrows=max_rows)
+                phones = excel_column_to_strings(df[phone_col])
+                names = excel_column_to_strings(df[name_col]) if name_col else [''] * len(phones)
+        except ImportError:
+            return None, upload_file_error(filename, 'Excel support not available')
+        except Exception as e:
+            return None, upload_file_error(filename, f'Error reading file: {str(e)}')
+        
+        rows = zip(phones, names)
+        # The sheet's row count is known without building rows for it
+        count_rows = lambda: max(excel_file.book.sheet_by_index(0).nrows - 1, 0)
+        close = excel_file.close
+    
+    print(f"📞 Phone column detected: {phone_col}", flush=True)
+    
+    if not phone_col:
+        close()
+        return None, upload_file_error(
+            filename, f'No phone column found. Available: {", ".join(map(str, columns))}'
+        )
+    
+    return {
+        'columns': [str(col) for col in columns],
+        'phone_col': str(phone_col),
+        'name_col': str(name_col) if name_col else None,
+        'rows': rows,
+        'count_rows': count_rows,
+        'close': close
+    }, None
+
+def parse_upload_file(filename, path, batch_id):
+    """Parse one spooled file into a staging CSV next to it. Runs in the parse process pool,
+    so it must not touch the database. Returns the per-file parse result."""
+    opened, error = open_upload_file(filename, path)
+    if error:
+        return error
+    
+    parsed_path = path + '.staged.csv'
+    try:
+        rows_parsed = write_parsed_rows(batch_id, opened['rows'], parsed_path)
+    except Exception as e:
+        return upload_file_error(filename, f'Error reading file: {str(e)}')
+    finally:
+        opened['close']()
+    
+    print(f"✅ Parsed {rows_parsed} rows from {filename}", flush=True)
+    
+    return {
+        'filename': filename,
+        'status': 'success',
+        'batch_id': batch_id,
+        'parsed_path': parsed_path,
+        'rows_parsed': rows_parsed,
+        'columns': opened['columns'],
+        'phone_column': opened['phone_col'],
+        'name_column': opened['name_col']
+    }
+
+def preview_upload_file(filename, stream, seen_phones):
+    """Dry run of one uploaded file: detect columns, parse and normalize a sample of rows and
+    check it against existing records with one set query, then extrapolate to the whole file.
+    Nothing is written. seen_phones carries normalized numbers across the files of one request."""
+    sample_size = app.config['UPLOAD_PREVIEW_SAMPLE_ROWS']
+    # One row past the sample tells whether the file was read to the end
+    opened, error = open_upload_file(filename, stream, max_rows=sample_size + 1)
+    if error:
+        return error
+    
+    try:
+        sample = list(itertools.islice(opened['rows'], sample_size))
+        exhausted = next(opened['rows'], None) is None
+        total_rows = len(sample) if exhausted else max(opened['count_rows'](), len(sample))
+    except Exception as e:
+        return upload_file_error(filename, f'Error reading file: {str(e)}')
+    finally:
+        opened['close']()
+    
+    normalized = normalize_phone_numbers([phone for phone, _ in sample])
+    valid = list({phone for phone in normalized if phone})
+    existing = {
+        phone for (phone,) in db.session.query(Record.phone_normalized)
+        .filter(Record.phone_normalized.in_(valid))
+    } if valid else set()
+    
+    blank_rows = invalid_rows = duplicate_rows = existing_rows = new_rows = 0
+    sample_rows = []
+    for (phone, name), phone_normalized in zip(sample, normalized):
+        if not phone:
+            blank_rows += 1
+            continue
+        if not phone_normalized:
+            invalid_rows += 1
+            outcome = 'invalid'
+        elif phone_normalized in existing:
+            existing_rows += 1
+            outcome = 'existing'
+        elif phone_normalized in seen_phones:
+            duplicate_rows += 1
+            outcome = 'duplicate'
+        else:
+            seen_phones.add(phone_normalized)
+            new_rows += 1
+            outcome = 'new'
+        if len(sample_rows) < 10:
+            sample_rows.append({
+                'phone_number': phone[:20],
+                'phone_normalized': phone_normalized,
+                'name': name[:100],
+                'outcome': outcome
+            })
+    
+    scale = total_rows / len(sample) if sample else 0
+    return {
+        'filename': filename,
+        'status': 'success',
+        'columns': opened['columns'],
+        'phone_column': opened['phone_col'],
+        'name_column': opened['name_col'],
+        'sampled_rows': len(sample),
+        'estimated_total_rows': total_rows,
+        'is_estimate': not exhausted,
+        'sample': {
+            'blank': blank_rows,
+            'invalid': invalid_rows,
+            'duplicates_in_upload': duplicate_rows,
+            'existing_records': existing_rows,
+            'new_records': new_rows
+        },
+        'estimated_duplicates': round((duplicate_rows + existing_rows) * scale),
+        'estimated_new_records': round(new_rows * scale),
+        'sample_rows': sample_rows
+    }
+
+def _init_parse_worker():
+    # Forked workers must not reuse (and later close) the parent's database connections
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+def parse_upload_files(files, on_parsed=None):
+    """Parse spooled files, in a process pool when there is more than one (CSV decoding and
+    Excel parsing are CPU-bound). Results keep the upload order so assignment stays deterministic."""
+    parse_args = [(f['filename'], f['path'], str(uuid.uuid4())) for f in files]
+    workers = min(len(parse_args), app.config['UPLOAD_PARSE_WORKERS'])
+    results = [None] * len(parse_args)
+    
+    if workers <= 1:
+        for index, args in enumerate(parse_args):
+            results[index] = parse_upload_file(*args)
+            if on_parsed:
+                on_parsed(results[index])
+        return results
+    
+    print(f"🧵 Parsing {len(parse_args)} files with {workers} processes", flush=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker) as executor:
+        futures = {executor.submit(parse_upload_file, *args): index for index, args in enumerate(parse_args)}
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if on_parsed:
+                on_parsed(results[index])
+    return results
+
+def load_upload_file(parsed, assignment, job_id):
+    """Stage a parsed file and insert its new records. Returns the per-file result."""
+    stage_parsed_file(parsed['parsed_path'])
+    records_found, records_added = insert_staged_records(parsed['batch_id'], assignment, job_id)
+    
+    if not records_found:
+        return {
+            'filename': parsed['filename'],
+            'status': 'error',
+            'message': 'No valid records found'
+        }
+    
+    skipped_duplicates = records_found - records_added
+    print(f"✅ {parsed['filename']}: added {records_added} records, skipped {skipped_duplicates} duplicates", flush=True)
+    
+    return {
+        'filename': parsed['filename'],
+        'status': 'success',
+        'records_found': records_found,
+        'records_added': records_added,
+        'skipped_duplicates': skipped_duplicates
+    }
+
+def fingerprint_upload_file(path, file_ext):
+    """Hash a spooled file and look it up among previously processed files.
+    Returns (content_hash, size, previous, kind): kind is 'identical' when the same bytes were
+    processed before, 'appended' when a processed CSV is a prefix of this file, otherwise None."""
+    size = os.path.getsize(path)
+    
+    # For CSVs, also hash every previously seen (smaller) size on the way, to spot appended files
+    prefix_sizes = []
+    if file_ext == '.csv':
+        prefix_sizes = sorted(
+            prefix_size for (prefix_size,) in db.session.query(UploadFingerprint.size)
+            .filter(UploadFingerprint.file_ext == file_ext, UploadFingerprint.size < size)
+            .distinct()
+        )
+    
+    digest = hashlib.sha256()
+    prefix_hashes = {}
+    boundaries = iter(prefix_sizes)
+    boundary = next(boundaries, None)
+    position = 0
+    last_byte = b''
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            while boundary is not None and boundary <= position + len(block):
+                cut = boundary - position
+                if cut:
+                    digest.update(block[:cut])
+                    last_byte = block[cut - 1:cut]
+                    block = block[cut:]
+                    position = boundary
+                # Rows can only have been appended after a complete line
+                if last_byte == b'\n':
+                    prefix_hashes[digest.hexdigest()] = boundary
+                boundary = next(boundaries, None)
+            if block:
+                digest.update(block)
+                last_byte = block[-1:]
+                position += len(block)
+    content_hash = digest.hexdigest()
+    
+    previous = UploadFingerprint.query.filter_by(content_hash=content_hash, size=size) \
+        .order_by(UploadFingerprint.id.desc()).first()
+    if previous:
+        return content_hash, size, previous, 'identical'
+    
+    if prefix_hashes:
+        candidates = [
+            fingerprint for fingerprint in UploadFingerprint.query.filter(
+                UploadFingerprint.file_ext == file_ext,
+                UploadFingerprint.content_hash.in_(list(prefix_hashes))
+            )
+            if prefix_hashes[fingerprint.content_hash] == fingerprint.size
+        ]
+        if candidates:
+            return content_hash, size, max(candidates, key=lambda fp: (fp.size, fp.id)), 'appended'
+    
+    return content_hash, size, None, None
+
+def forget_upload_fingerprints(job_ids=None):
+    """Drop the fingerprints of files processed by the given upload jobs, and of files that extend
+    them, so re-uploading those files inserts their deleted records again. Call when records are
+    deleted, with the records' upload_job_id; without job_ids every fingerprint is dropped."""
+    if job_ids is None:
+        UploadFingerprint.query.delete()
+        return
+    
+    fingerprint_ids = {
+        fingerprint_id for (fingerprint_id,) in
+        db.session.query(UploadFingerprint.id).filter(UploadFingerprint.job_id.in_(job_ids))
+    }
+    pending = fingerprint_ids
+    while pending:
+        pending = {
+            fingerprint_id for (fingerprint_id,) in
+            db.session.query(UploadFingerprint.id).filter(UploadFingerprint.previous_id.in_(pending))
+        } - fingerprint_ids
+        fingerprint_ids |= pending
+    
+    if fingerprint_ids:
+        UploadFingerprint.query.filter(UploadFingerprint.id.in_(fingerprint_ids)).delete(synchronize_session=False)
+
+def strip_processed_prefix(path, prefix_size):
+    """Rewrite a spooled CSV as its header line plus only the bytes after an already processed prefix"""
+    trimmed_path = path + '.appended'
+    with open(path, 'rb') as source, open(trimmed_path, 'wb') as output:
+        output.write(source.readline())
+        source.seek(prefix_size)
+        shutil.copyfileobj(source, output, 1024 * 1024)
+    os.replace(trimmed_path, path)
+
+def run_upload_job(job):
+    """Process a claimed upload job: parse all files (in parallel), then dedupe and insert
+    them in upload order within a single transaction."""
+    print(f"⚙️ Running upload job {job.id}", flush=True)
+    
+    try:
+        # Get active callers
+        if job.distribution_type == 'single' and job.caller_id:
+            callers = [User.query.get(job.caller_id)]
+            print(f"👤 Assigning all records to: {callers[0].name}", flush=True)
+        else:
+            callers = User.query.filter_by(role='caller').order_by(User.id).all()
+            if not callers:
+                raise ValueError('No callers found. Please create caller users first.')
+            print(f"👥 Distributing by backlog among {len(callers)} callers", flush=True)
+        
+        caller_ids = [caller.id for caller in callers]
+        weights = {int(caller_id): weight for caller_id, weight in json.loads(job.caller_weights or '{}').items()}
+        assignment = {
+            'backlog': get_caller_backlogs(caller_ids),
+            'weights': weights
+        }
+        
+        files = json.loads(job.files)
+        # Files rejected at upload time are already recorded
+        file_results = json.loads(job.file_results) if job.file_results else []
+        
+        # Report parsing progress as each file finishes
+        def on_parsed(parsed):
+            job.rows_parsed += parsed.get('rows_parsed', 0)
+            db.session.commit()
+        
+        # Skip files processed before, and cut appended CSVs down to the rows past the known prefix
+        entries = []
+        for f in files:
+            file_ext = os.path.splitext(f['filename'])[1].lower()
+            content_hash, size, previous, kind = fingerprint_upload_file(f['path'], file_ext)
+            entry = {'file': f, 'content_hash': content_hash, 'size': size, 'file_ext': file_ext, 'prefix': None, 'result': None}
+            if kind == 'identical':
+                print(f"♻️ {f['filename']} is identical to a file from job {previous.job_id}, skipping", flush=True)
+                entry['result'] = {
+                    'filename': f['filename'],
+                    'status': 'success',
+                    'message': 'Identical file already processed',
+                    'records_found': previous.records_found,
+                    'records_added': 0,
+                    'skipped_duplicates': previous.records_found,
+                    'unchanged': True,
+                    'previous_job_id': previous.job_id,
+                    'previous_result': json.loads(previous.result) if previous.result else None
+                }
+            elif kind == 'appended':
+                print(f"♻️ {f['filename']} extends a file from job {previous.job_id}, processing only the new rows", flush=True)
+                strip_processed_prefix(f['path'], previous.size)
+                entry['prefix'] = previous
+            entries.append(entry)
+        
+        pending = [entry for entry in entries if not entry['result']]
+        parsed_files = parse_upload_files([entry['file'] for entry in pending], on_parsed=on_parsed)
+        for entry, parsed in zip(pending, parsed_files):
+            entry['parsed'] = parsed
+        
+        # Merge step: stage, dedupe and insert every file in upload order, one transaction
+        for entry in entries:
+            parsed = entry.get('parsed')
+            if entry['result'] or parsed['status'] != 'success':
+                file_result = entry['result'] or parsed
+                file_results.append(file_result)
+                job.skipped_duplicates += file_result.get('skipped_duplicates', 0)
+                continue
+            
+            file_result = load_upload_file(parsed, assignment, job.id)
+            prefix = entry['prefix']
+            if prefix:
+                file_result['previously_processed_rows'] = prefix.rows_parsed
+            file_results.append(file_result)
+            if file_result['status'] != 'success':
+                continue
+            
+            job.records_added += file_result['records_added']
+            job.skipped_duplicates += file_result['skipped_duplicates']
+            db.session.add(UploadFingerprint(
+                content_hash=entry['content_hash'],
+                size=entry['size'],
+                file_ext=entry['file_ext'],
+                columns=json.dumps(parsed['columns']),
+                phone_column=parsed['phone_column'],
+                name_column=parsed['name_column'],
+                rows_parsed=parsed['rows_parsed'] + (prefix.rows_parsed if prefix else 0),
+                records_found=file_result['records_found'] + (prefix.records_found if prefix else 0),
+                job_id=job.id,
+                previous_id=prefix.id if prefix else None,
+                result=json.dumps(file_result)
+            ))
+        
+        job.file_results = json.dumps(file_results)
+        
+        job.result = json.dumps({
+            'success': True,
+            'message': f'Processed {len(file_results)} files successfully',
+            'total_records_added': job.records_added,
+            'total_skipped_duplicates': job.skipped_duplicates,
+            'files_processed': len([f for f in file_results if f['status'] == 'success']),
+            'files_failed': len([f for f in file_results if f['status'] == 'error']),
+            'file_results': file_results,
+            'final_distribution': get_final_distribution(callers)
+        })
+        job.status = 'completed'
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        print(f"✅ Upload job {job.id} completed: {job.records_added} records added", flush=True)
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Upload job {job.id} failed: {str(e)}", flush=True)
+        import traceback
+        traceback.print_exc()
+        job.status = 'failed'
+        job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    finally:
+        shutil.rmtree(os.path.join(app.config['UPLOAD_SPOOL_DIR'], job.id), ignore_errors=True)
+
+def get_final_distribution(callers):
+    """Total records per caller name, in one grouped query"""
+    counts = dict(db.session.query(Record.caller_id, db.func.count(Record.id)).filter(
+        Record.caller_id.in_([caller.id for caller in callers])
+    ).group_by(Record.caller_id).all())
+    return {caller.name: counts.get(caller.id, 0) for caller in callers}
+
+def claim_upload_job():
+    """Atomically pick the oldest queued job and mark it running (SKIP LOCKED on PostgreSQL)"""
+    job = UploadJob.query.filter_by(status='queued').order_by(
+        UploadJob.created_at
+    ).with_for_update(skip_locked=True).first()
+    
+    if not job:
+        db.session.rollback()
+        return None
+    
+    job.status = 'running'
+    job.started_at = datetime.utcnow()
+    db.session.commit()
+    return job
+
+def reclaim_stale_upload_jobs():
+    """Requeue jobs left running by a worker that died mid-job. Nothing of a job is inserted until its
+    final commit, so a rerun starts clean; a job that was already retried once, or whose spooled files
+    are gone, is failed instead so it cannot crash workers forever."""
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config['UPLOAD_JOB_TIMEOUT'])
+    stale_jobs = UploadJob.query.filter(
+        UploadJob.status == 'running',
+        UploadJob.started_at < cutoff
+    ).with_for_update(skip_locked=True).all()
+    
+    for job in stale_jobs:
+        job_dir = os.path.join(app.config['UPLOAD_SPOOL_DIR'], job.id)
+        if job.error or not os.path.isdir(job_dir):
+            print(f"⚠️ Upload job {job.id} was abandoned by its worker, marking it failed", flush=True)
+            job.status = 'failed'
+            job.error = 'The upload worker stopped while processing this job. Please upload the files again.'
+            job.finished_at = datetime.utcnow()
+        else:
+            print(f"⚠️ Upload job {job.id} was abandoned by its worker, requeueing it", flush=True)
+            job.status = 'queued'
+            job.error = 'The upload worker stopped while processing this job, retrying'
+            job.rows_parsed = 0
+            job.started_at = None
+    
+    db.session.commit()
+    return len(stale_jobs)
+
+def get_upload_distribution(params):
+    """Validate the distribution parameters of an upload request (form or JSON body).
+    Returns (distribution, error) where error is a message for a 400 response."""
+    distribution_type = params.get('distribution_type') or 'equal'
+    caller_id = params.get('caller_id')
+    
+    print(f"📊 Distribution type: {distribution_type}", flush=True)
+    
+    if distribution_type == 'single' and caller_id:
+        # Single caller distribution
+        try:
+            caller = User.query.get(int(caller_id))
+        except (ValueError, TypeError):
+            caller = None
+        if not caller or caller.role != 'caller':
+            return None, 'Invalid caller selected'
+    elif not User.query.filter_by(role='caller').first():
+        return None, 'No callers found. Please create caller users first.'
+    
+    # Optional per-caller weights, e.g. {"3": 2, "4": 0.5} - a weight of 2 takes twice the work
+    caller_weights = params.get('caller_weights')
+    if caller_weights:
+        try:
+            if isinstance(caller_weights, str):
+                caller_weights = json.loads(caller_weights)
+            weights = {int(key): float(value) for key, value in caller_weights.items()}
+            if any(weight <= 0 for weight in weights.values()):
+                raise ValueError('weights must be positive')
+        except (ValueError, TypeError, AttributeError) as e:
+            return None, f'Invalid caller weights: {str(e)}'
+        caller_weights = json.dumps(weights)
+    
+    return {
+        'distribution_type': distribution_type,
+        'caller_id': int(caller_id) if distribution_type == 'single' and caller_id else None,
+        'caller_weights': caller_weights or None
+    }, None
+
+def get_upload_session_dir(session_id):
+    return os.path.join(app.config['UPLOAD_SPOOL_DIR'], 'sessions', session_id)
+
+def get_received_chunks(session):
+    """Chunk numbers already stored for a session - the chunk files on disk are the source of truth"""
+    session_dir = get_upload_session_dir(session.id)
+    if not os.path.isdir(session_dir):
+        return []
+    return sorted(
+        int(name[:-len('.part')]) for name in os.listdir(session_dir)
+        if name.endswith('.part') and name[:-len('.part')].isdigit()
+    )
+
+def get_upload_session_expiry(session):
+    return session.created_at + timedelta(seconds=app.config['UPLOAD_SESSION_TTL'])
+
+def is_upload_session_expired(session):
+    return session.status == 'open' and get_upload_session_expiry(session) <= datetime.utcnow()
+
+def expire_upload_sessions():
+    """Delete chunked upload sessions left unfinalized past UPLOAD_SESSION_TTL, with their chunks,
+    and any session chunk directory that no longer has an open session"""
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config['UPLOAD_SESSION_TTL'])
+    expired = (UploadSession.status == 'open', UploadSession.created_at < cutoff)
+    expired_ids = [session_id for (session_id,) in db.session.query(UploadSession.id).filter(*expired)]
+    if expired_ids:
+        # Conditions repeated so a session finalized in the meantime is kept
+        UploadSession.query.filter(UploadSession.id.in_(expired_ids), *expired).delete(synchronize_session=False)
+    db.session.commit()
+    for session_id in expired_ids:
+        shutil.rmtree(get_upload_session_dir(session_id), ignore_errors=True)
+    
+    sessions_dir = os.path.join(app.config['UPLOAD_SPOOL_DIR'], 'sessions')
+    if not os.path.isdir(sessions_dir):
+        return len(expired_ids)
+    open_ids = {session_id for (session_id,) in db.session.query(UploadSession.id).filter_by(status='open')}
+    orphan_cutoff = time.time() - app.config['UPLOAD_SESSION_TTL']
+    for name in os.listdir(sessions_dir):
+        session_dir = os.path.join(sessions_dir, name)
+        # A directory may briefly exist before its session row is visible, so only old ones are orphans
+        if name not in open_ids and os.path.getmtime(session_dir) < orphan_cutoff:
+            shutil.rmtree(session_dir, ignore_errors=True)
+    
+    if expired_ids:
+        print(f"🧹 Expired {len(expired_ids)} abandoned upload session(s)", flush=True)
+    return len(expired_ids)
+
+def upload_session_to_dict(session):
+    received_chunks = get_received_chunks(session) if session.status == 'open' else list(range(session.total_chunks))
+    return {
+        'session_id': session.id,
+        'status': session.status,
+        'filename': session.filename,
+        'total_size': session.total_size,
+        'chunk_size': session.chunk_size,
+        'total_chunks': session.total_chunks,
+        'received_chunks': received_chunks,
+        'missing_chunks': sorted(set(range(session.total_chunks)) - set(received_chunks)),
+        'job_id': session.job_id,
+        'created_at': session.created_at.isoformat() if session.created_at else None,
+        'expires_at': get_upload_session_expiry(session).isoformat() if session.status == 'open' else None
+    }
+
+def upload_job_to_dict(job):
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'rows_parsed': job.rows_parsed,
+        'records_added': job.records_added,
+        'skipped_duplicates': job.skipped_duplicates,
+        'file_results': json.loads(job.file_results) if job.file_results else [],
+        'error': job.error,
+        'result': json.loads(job.result) if job.result else None,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
 # Upload Routes
 @app.route('/api/admin/upload', methods=['POST'])
 @jwt_required()
 def upload_csv():
+    """Spool uploaded files to disk and queue them for the upload worker"""
     current_user_id = int(get_jwt_identity())
     user = User.query.get(current_user_id)
     
@@ -413,6 +2099,7 @@ def upload_csv():
                 'error': 'hidden_from_caller column missing'
             }), 500
     except Exception as e:
+        db.session.rollback()
         print(f"❌ Error checking database schema: {e}", flush=True)
     
     # Handle multiple files
@@ -423,299 +2110,453 @@ def upload_csv():
         print("❌ No files in request", flush=True)
         return jsonify({'message': 'No files uploaded'}), 400
     
-    # Get distribution parameters
-    distribution_type = request.form.get('distribution_type', 'equal')
-    caller_id = request.form.get('caller_id')
+    # Dry run: report what the upload would do without writing anything
+    if request.form.get('preview', '').lower() in ('1', 'true', 'yes'):
+        seen_phones = set()
+        file_results = []
+        for file in files:
+            if file.filename == '':
+                continue
+            file_ext = '.' + file.filename.split('.')[-1].lower()
+            if file_ext not in ALLOWED_UPLOAD_EXTENSIONS:
+                file_results.append(upload_file_error(file.filename, 'Invalid file type'))
+                continue
+            # Werkzeug spools uploads to a seekable temporary file, so Excel readers can use it directly
+            file_results.append(preview_upload_file(file.filename, file.stream, seen_phones))
+        
+        return jsonify({
+            'message': f'Preview of {len(file_results)} file(s) - nothing was uploaded',
+            'preview': True,
+            'file_results': file_results,
+            'estimated_total_rows': sum(r.get('estimated_total_rows', 0) for r in file_results),
+            'estimated_duplicates': sum(r.get('estimated_duplicates', 0) for r in file_results),
+            'estimated_new_records': sum(r.get('estimated_new_records', 0) for r in file_results)
+        }), 200
     
-    print(f"📊 Distribution type: {distribution_type}", flush=True)
+    distribution, error = get_upload_distribution(request.form)
+    if error:
+        return jsonify({'message': error}), 400
     
-    # Get active callers
-    if distribution_type == 'single' and caller_id:
-        # Single caller distribution
-        caller = User.query.get(int(caller_id))
-        if not caller or caller.role != 'caller':
-            return jsonify({'message': 'Invalid caller selected'}), 400
-        callers = [caller]
-        print(f"👤 Assigning all records to: {caller.name}", flush=True)
-    else:
-        # Equal distribution
-        callers = User.query.filter_by(role='caller').all()
-        if not callers:
-            return jsonify({'message': 'No callers found. Please create caller users first.'}), 400
-        print(f"👥 Distributing equally among {len(callers)} callers", flush=True)
+    job_id = str(uuid.uuid4())
+    job_dir = os.path.join(app.config['UPLOAD_SPOOL_DIR'], job_id)
     
     try:
-        total_records_added = 0
-        total_skipped_duplicates = 0
-        file_results = []
+        os.makedirs(job_dir, exist_ok=True)
         
-        for file in files:
+        spooled_files = []
+        invalid_files = []
+        for index, file in enumerate(files):
             if file.filename == '':
                 continue
             
             # Validate file extension
-            allowed_extensions = ['.csv', '.xlsx', '.xls']
             file_ext = '.' + file.filename.split('.')[-1].lower()
-            if file_ext not in allowed_extensions:
-                file_results.append({
+            if file_ext not in ALLOWED_UPLOAD_EXTENSIONS:
+                invalid_files.append({
                     'filename': file.filename,
                     'status': 'error',
                     'message': 'Invalid file type'
                 })
                 continue
             
-            records_data = []
-            
-            # Smart column detection
-            def find_column(columns, possible_names):
-                columns_lower = [col.lower().strip() for col in columns]
-                for possible in possible_names:
-                    for i, col in enumerate(columns_lower):
-                        if possible.lower() in col or col in possible.lower():
-                            return columns[i]
-                return None
-            
-            # Process file based on extension
-            if file_ext == '.csv':
-                import csv
-                import io
-                
-                print(f"📄 Processing CSV file: {file.filename}", flush=True)
-                
-                file.seek(0)
-                content = file.read().decode('utf-8-sig')
-                csv_reader = csv.DictReader(io.StringIO(content))
-                
-                print(f"📋 CSV columns: {csv_reader.fieldnames}", flush=True)
-                
-                # Smart phone column detection
-                phone_col = find_column(csv_reader.fieldnames, 
-                    ['phone', 'mobile', 'number', 'contact', 'cell', 'telephone'])
-                
-                print(f"📞 Phone column detected: {phone_col}", flush=True)
-                
-                if not phone_col:
-                    file_results.append({
-                        'filename': file.filename,
-                        'status': 'error',
-                        'message': f'No phone column found. Available: {", ".join(csv_reader.fieldnames)}'
-                    })
-                    continue
-                
-                # Smart name column detection
-                name_col = find_column(csv_reader.fieldnames, 
-                    ['name', 'customer', 'client', 'person', 'full_name', 'firstname'])
-                
-                seen_phones = set()
-                row_count = 0
-                for row in csv_reader:
-                    row_count += 1
-                    phone = str(row.get(phone_col, '')).strip()
-                    if phone and phone not in seen_phones:
-                        seen_phones.add(phone)
-                        records_data.append({
-                            'phone_number': phone,
-                            'name': str(row.get(name_col, '')).strip() if name_col else ''
-                        })
-                
-                print(f"✅ Processed {row_count} rows, found {len(records_data)} unique records", flush=True)
-            else:
-                try:
-                    import pandas as pd
-                    
-                    file.seek(0)
-                    df = pd.read_excel(file)
-                    
-                    # Smart phone column detection
-                    phone_col = find_column(df.columns.tolist(), 
-                        ['phone', 'mobile', 'number', 'contact', 'cell', 'telephone'])
-                    
-                    if not phone_col:
-                        file_results.append({
-                            'filename': file.filename,
-                            'status': 'error',
-                            'message': f'No phone column found. Available: {", ".join(df.columns)}'
-                        })
-                        continue
-                    
-                    # Smart name column detection
-                    name_col = find_column(df.columns.tolist(), 
-                        ['name', 'customer', 'client', 'person', 'full_name', 'firstname'])
-                    
-                    df = df.dropna(subset=[phone_col])
-                    df[phone_col] = df[phone_col].astype(str).str.strip()
-                    df = df[df[phone_col] != '']
-                    df = df.drop_duplicates(subset=[phone_col])
-                    
-                    for _, row in df.iterrows():
-                        records_data.append({
-                            'phone_number': str(row[phone_col]).strip(),
-                            'name': str(row.get(name_col, '')).strip() if name_col and pd.notna(row.get(name_col)) else ''
-                        })
-                except ImportError:
-                    file_results.append({
-                        'filename': file.filename,
-                        'status': 'error',
-                        'message': 'Excel support not available'
-                    })
-                    continue
-                except Exception as e:
-                    file_results.append({
-                        'filename': file.filename,
-                        'status': 'error',
-                        'message': f'Error reading file: {str(e)}'
-                    })
-                    continue
-            
-            if not records_data:
-                file_results.append({
-                    'filename': file.filename,
-                    'status': 'error',
-                    'message': 'No valid records found'
-                })
-                continue
-            
-            # Process records for this file (distribute equally among callers)
-            file_records_added = 0
-            file_skipped_duplicates = 0
-            
-            print(f"💾 Starting to save {len(records_data)} records to database...", flush=True)
-            
-            for index, record_data in enumerate(records_data):
-                phone_number = record_data['phone_number']
-                
-                # Check for existing record
-                existing = Record.query.filter_by(phone_number=phone_number).first()
-                if existing:
-                    file_skipped_duplicates += 1
-                    continue
-                
-                # Assign to caller (round-robin for this file)
-                caller = callers[index % len(callers)]
-                
-                # Create new record
-                try:
-                    record = Record(
-                        caller_id=caller.id,
-                        phone_number=phone_number,
-                        name=record_data['name'],
-                        hidden_from_caller=False
-                    )
-                    db.session.add(record)
-                    file_records_added += 1
-                except Exception as e:
-                    print(f"❌ Error adding record {phone_number}: {str(e)}", flush=True)
-                    print(f"❌ Error type: {type(e).__name__}", flush=True)
-                    import traceback
-                    print(f"❌ Traceback: {traceback.format_exc()}", flush=True)
-                    continue
-            
-            print(f"✅ Added {file_records_added} records, skipped {file_skipped_duplicates} duplicates", flush=True)
-            
-            total_records_added += file_records_added
-            total_skipped_duplicates += file_skipped_duplicates
-            
-            file_results.append({
-                'filename': file.filename,
-                'status': 'success',
-                'records_found': len(records_data),
-                'records_added': file_records_added,
-                'skipped_duplicates': file_skipped_duplicates
+            path = os.path.join(job_dir, f'{index}_{secure_filename(file.filename) or "upload" + file_ext}')
+            file.save(path)
+            spooled_files.append({'filename': file.filename, 'path': path})
+        
+        job = UploadJob(
+            id=job_id,
+            created_by=current_user_id,
+            files=json.dumps(spooled_files),
+            file_results=json.dumps(invalid_files),
+            **distribution
+        )
+        
+        if not spooled_files:
+            # Nothing for the worker to do
+            os.rmdir(job_dir)
+            job.status = 'completed'
+            job.finished_at = datetime.utcnow()
+            job.result = json.dumps({
+                'success': True,
+                'message': f'Processed {len(files)} files successfully',
+                'total_records_added': 0,
+                'total_skipped_duplicates': 0,
+                'files_processed': 0,
+                'files_failed': len(invalid_files),
+                'file_results': invalid_files,
+                'final_distribution': {}
             })
         
-        # Commit all changes
-        print(f"💾 Committing {total_records_added} records to database...", flush=True)
+        db.session.add(job)
+        db.session.commit()
+        
+        print(f"📥 Upload job {job_id} queued with {len(spooled_files)} files", flush=True)
+        
+        return jsonify({
+            'message': 'Upload queued for processing',
+            'job_id': job_id,
+            'status': job.status
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        shutil.rmtree(job_dir, ignore_errors=True)
+        print(f"❌ Upload error: {str(e)}", flush=True)
+        import traceback
+        traceback.print_exc()
+        return jsonify({'message': f'Error processing files: {str(e)}'}), 500
+
+@app.route('/api/admin/upload/<job_id>', methods=['GET'])
+@jwt_required()
+def get_upload_job(job_id):
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    
+    if user.role != 'admin':
+        return jsonify({'message': 'Admin access required'}), 403
+    
+    job = UploadJob.query.get_or_404(job_id)
+    
+    return jsonify(upload_job_to_dict(job))
+
+# Chunked Upload Routes - initiate, PUT numbered chunks, then finalize into an upload job
+@app.route('/api/admin/upload/sessions', methods=['POST'])
+@jwt_required()
+def create_upload_session():
+    """Start a resumable upload of one large file"""
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    
+    if user.role != 'admin':
+        return jsonify({'message': 'Admin access required'}), 403
+    
+    data = request.get_json() or {}
+    filename = (data.get('filename') or '').strip()
+    
+    file_ext = os.path.splitext(filename)[1].lower()
+    if file_ext not in ALLOWED_UPLOAD_EXTENSIONS:
+        return jsonify({'message': 'Invalid file type. Only CSV and Excel files allowed.'}), 400
+    
+    try:
+        total_size = int(data.get('total_size'))
+        chunk_size = int(data.get('chunk_size') or app.config['UPLOAD_CHUNK_SIZE'])
+    except (ValueError, TypeError):
+        return jsonify({'message': 'total_size and chunk_size must be integers'}), 400
+    
+    if total_size <= 0 or chunk_size <= 0 or chunk_size > app.config['UPLOAD_MAX_CHUNK_SIZE']:
+        return jsonify({'message': f'Invalid sizes (maximum chunk size is {app.config["UPLOAD_MAX_CHUNK_SIZE"]} bytes)'}), 400
+    
+    checksum = (data.get('checksum') or '').lower() or None
+    if checksum and len(checksum) != 64:
+        return jsonify({'message': 'checksum must be a SHA-256 hex digest'}), 400
+    
+    distribution, error = get_upload_distribution(data)
+    if error:
+        return jsonify({'message': error}), 400
+    
+    session = UploadSession(
+        id=str(uuid.uuid4()),
+        created_by=current_user_id,
+        filename=filename[:255],
+        total_size=total_size,
+        chunk_size=chunk_size,
+        total_chunks=-(-total_size // chunk_size),
+        checksum=checksum,
+        **distribution
+    )
+    db.session.add(session)
+    db.session.commit()
+    
+    os.makedirs(get_upload_session_dir(session.id), exist_ok=True)
+    
+    print(f"📦 Upload session {session.id} started: {filename} ({total_size} bytes, {session.total_chunks} chunks)", flush=True)
+    
+    return jsonify(upload_session_to_dict(session)), 201
+
+@app.route('/api/admin/upload/sessions/<session_id>', methods=['GET'])
+@jwt_required()
+def get_upload_session(session_id):
+    """Session status - clients resume by sending only the missing chunks"""
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    
+    if user.role != 'admin':
+        return jsonify({'message': 'Admin access required'}), 403
+    
+    session = UploadSession.query.get_or_404(session_id)
+    
+    return jsonify(upload_session_to_dict(session))
+
+@app.route('/api/admin/upload/sessions/<session_id>/chunks/<int:chunk_number>', methods=['PUT'])
+@jwt_required()
+def upload_session_chunk(session_id, chunk_number):
+    """Store one chunk (raw request body), verified against its X-Chunk-Checksum SHA-256 header.
+    Re-sending a chunk replaces it, so retries are safe."""
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    
+    if user.role != 'admin':
+        return jsonify({'message': 'Admin access required'}), 403
+    
+    session = UploadSession.query.get_or_404(session_id)
+    
+    if session.status != 'open':
+        return jsonify({'message': 'Upload session is already finalized'}), 409
+    if is_upload_session_expired(session):
+        return jsonify({'message': 'Upload session has expired. Please start the upload again.'}), 410
+    if chunk_number < 0 or chunk_number >= session.total_chunks:
+        return jsonify({'message': f'Chunk number must be between 0 and {session.total_chunks - 1}'}), 400
+    
+    expected_checksum = (request.headers.get('X-Chunk-Checksum') or '').lower()
+    if not expected_checksum:
+        return jsonify({'message': 'X-Chunk-Checksum header (SHA-256 hex) is required'}), 400
+    
+    if chunk_number < session.total_chunks - 1:
+        expected_size = session.chunk_size
+    else:
+        expected_size = session.total_size - session.chunk_size * (session.total_chunks - 1)
+    
+    session_dir = get_upload_session_dir(session.id)
+    os.makedirs(session_dir, exist_ok=True)
+    chunk_path = os.path.join(session_dir, f'{chunk_number}.part')
+    
+    # Stream into a temp file and only move it into place once verified
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=session_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            for block in iter(lambda: request.stream.read(64 * 1024), b''):
+                size += len(block)
+                if size > expected_size:
+                    break
+                digest.update(block)
+                output.write(block)
+        
+        if size != expected_size:
+            os.remove(temp_path)
+            return jsonify({'message': f'Chunk {chunk_number} must be {expected_size} bytes'}), 400
+        if digest.hexdigest() != expected_checksum:
+            os.remove(temp_path)
+            return jsonify({'message': f'Checksum mismatch for chunk {chunk_number}'}), 400
+        
+        os.replace(temp_path, chunk_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    received_chunks = get_received_chunks(session)
+    
+    return jsonify({
+        'chunk_number': chunk_number,
+        'received': len(received_chunks),
+        'total_chunks': session.total_chunks
+    })
+
+@app.route('/api/admin/upload/sessions/<session_id>/finalize', methods=['POST'])
+@jwt_required()
+def finalize_upload_session(session_id):
+    """Assemble the chunks into the spool dir and queue the file for the upload worker"""
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    
+    if user.role != 'admin':
+        return jsonify({'message': 'Admin access required'}), 403
+    
+    # Lock the session so a retried finalize cannot queue the file twice
+    session = UploadSession.query.filter_by(id=session_id).with_for_update().first_or_404()
+    
+    if session.status == 'finalized':
+        db.session.rollback()
+        return jsonify({
+            'message': 'Upload queued for processing',
+            'job_id': session.job_id,
+            'status': UploadJob.query.get(session.job_id).status
+        }), 202
+    
+    if is_upload_session_expired(session):
+        db.session.rollback()
+        return jsonify({'message': 'Upload session has expired. Please start the upload again.'}), 410
+    
+    missing_chunks = sorted(set(range(session.total_chunks)) - set(get_received_chunks(session)))
+    if missing_chunks:
+        db.session.rollback()
+        return jsonify({
+            'message': f'{len(missing_chunks)} chunk(s) missing',
+            'missing_chunks': missing_chunks
+        }), 409
+    
+    session_dir = get_upload_session_dir(session.id)
+    job_id = str(uuid.uuid4())
+    job_dir = os.path.join(app.config['UPLOAD_SPOOL_DIR'], job_id)
+    file_ext = os.path.splitext(session.filename)[1].lower()
+    path = os.path.join(job_dir, f'0_{secure_filename(session.filename) or "upload" + file_ext}')
+    
+    try:
+        os.makedirs(job_dir, exist_ok=True)
+        
+        digest = hashlib.sha256()
+        with open(path, 'wb') as output:
+            for chunk_number in range(session.total_chunks):
+                with open(os.path.join(session_dir, f'{chunk_number}.part'), 'rb') as chunk:
+                    for block in iter(lambda: chunk.read(1024 * 1024), b''):
+                        digest.update(block)
+                        output.write(block)
+        
+        if session.checksum and digest.hexdigest() != session.checksum:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            db.session.rollback()
+            return jsonify({'message': 'Checksum mismatch for the assembled file'}), 400
+        
+        job = UploadJob(
+            id=job_id,
+            created_by=current_user_id,
+            distribution_type=session.distribution_type,
+            caller_id=session.caller_id,
+            caller_weights=session.caller_weights,
+            files=json.dumps([{'filename': session.filename, 'path': path}]),
+            file_results=json.dumps([])
+        )
+        db.session.add(job)
+        db.session.flush()
+        
+        session.status = 'finalized'
+        session.job_id = job_id
         db.session.commit()
-        print(f"✅ Database commit successful!", flush=True)
+        
+        shutil.rmtree(session_dir, ignore_errors=True)
+        
+        print(f"📥 Upload session {session.id} assembled into job {job_id}", flush=True)
         
         return jsonify({
-            'success': True,
-            'message': f'Processed {len(files)} files successfully',
-            'total_records_added': total_records_added,
-            'total_skipped_duplicates': total_skipped_duplicates,
-            'files_processed': len([f for f in file_results if f['status'] == 'success']),
-            'files_failed': len([f for f in file_results if f['status'] == 'error']),
-            'file_results': file_results,
-            'final_distribution': {caller.name: Record.query.filter_by(caller_id=caller.id).count() 
-                                 for caller in callers}
-        })
+            'message': 'Upload queued for processing',
+            'job_id': job_id,
+            'status': job.status
+        }), 202
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Upload error: {str(e)}", flush=True)
-        import traceback
-        traceback.print_exc()
-        return jsonify({'message': f'Error processing files: {str(e)}'}), 500
+        shutil.rmtree(job_dir, ignore_errors=True)
+        print(f"❌ Error finalizing upload session: {str(e)}", flush=True)
+        return jsonify({'message': f'Error finalizing upload: {str(e)}'}), 500
 
 # Caller Routes
+def get_caller_tab_filters(caller_id):
+    """The caller dashboard tabs as SQL conditions on records.
+    Returns (has_alarm, filters) - has_alarm is the active reminder EXISTS, filters maps tab to condition."""
+    # Correlated EXISTS - evaluated per row by the database instead of one query per record
+    has_alarm = db.exists().where(
+        Reminder.record_id == Record.id,
+        Reminder.caller_id == caller_id,
+        Reminder.is_active == True
+    )
+    
+    return has_alarm, {
+        # Records with active reminders
+        'alarms': has_alarm,
+        'try_again': Record.response == 'Not Picked',
+        'visited': Record.visit == 'visited',
+        'confirmed': Record.visit == 'confirmed',
+        # Records that are not confirmed/visited and not "Not Picked"
+        'other': db.and_(
+            Record.visit.notin_(['confirmed', 'visited']),
+            db.or_(Record.response != 'Not Picked', Record.response.is_(None))
+        )
+    }
+
 @app.route('/api/caller/records', methods=['GET'])
 @jwt_required()
 def get_caller_records():
     current_user_id = int(get_jwt_identity())
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     search = request.args.get('search', '')
     tab = request.args.get('tab', 'all')  # all, alarms, confirmed, other
-    
-    # Base query - exclude hidden records
-    query = Record.query.filter_by(caller_id=current_user_id, hidden_from_caller=False)
+    include_total = request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes')
+    per_page = 50
+    
+    # Any change to the caller's records or active reminders changes the ETag
+    last_updated, record_count, alarm_count, last_alarm_id = db.session.query(
+        db.select(db.func.max(Record.updated_at)).where(Record.caller_id == current_user_id).scalar_subquery(),
+        db.select(db.func.count(Record.id)).where(Record.caller_id == current_user_id).scalar_subquery(),
+        db.select(db.func.count(Reminder.id)).where(Reminder.caller_id == current_user_id, Reminder.is_active == True).scalar_subquery(),
+        db.select(db.func.max(Reminder.id)).where(Reminder.caller_id == current_user_id, Reminder.is_active == True).scalar_subquery()
+    ).one()
+    etag = get_list_etag(last_updated, record_count, alarm_count, last_alarm_id)
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    
+    has_alarm, tab_filters = get_caller_tab_filters(current_user_id)
+    
+    # Page and alarm flags in a single statement
+    query = db.session.query(
+        Record,
+        has_alarm.label('has_alarm')
+    ).filter(Record.caller_id == current_user_id, Record.hidden_from_caller == False)
     
     # Filter by tab
-    if tab == 'alarms':
-        # Records with active reminders
-        reminder_record_ids = [r.record_id for r in Reminder.query.filter_by(
-            caller_id=current_user_id,
-            is_active=True
-        ).all()]
-        query = query.filter(Record.id.in_(reminder_record_ids)) if reminder_record_ids else query.filter(Record.id == -1)
-    elif tab == 'try_again':
-        query = query.filter_by(response='Not Picked')
-    elif tab == 'visited':
-        query = query.filter_by(visit='visited')
-    elif tab == 'confirmed':
-        query = query.filter_by(visit='confirmed')
-    elif tab == 'other':
-        # Show records that are not confirmed/visited and not "Not Picked"
-        query = query.filter(Record.visit.notin_(['confirmed', 'visited']))
-        query = query.filter(db.or_(Record.response != 'Not Picked', Record.response.is_(None)))
-    
-    if search:
-        query = query.filter(
-            db.or_(
-                Record.phone_number.contains(search),
-                Record.name.contains(search)
+    if tab in tab_filters:
+        query = query.filter(tab_filters[tab])
+    
+    query, relevance = search_records(query, [((Record.phone_number, Record.name), search)])
+    
+    try:
+        if relevance is not None:
+            # Best matches first
+            query = query.add_columns(relevance)
+            rows, next_cursor = keyset_page(
+                query, [relevance, Record.id], lambda row: [row.relevance, row[0].id],
+                cursor, per_page, descending=True
             )
+        else:
+            rows, next_cursor = keyset_page(query, [Record.id], lambda row: [row[0].id], cursor, per_page)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    records_with_alarms = [{
+        'id': r.id,
+        'phone_number': r.phone_number,
+        'name': r.name,
+        'response': r.response,
+        'notes': r.notes,
+        'visit': r.visit,
+        'has_alarm': bool(alarm),
+        'version': r.version,
+        'updated_at': r.updated_at.isoformat() if r.updated_at else None
+    } for r, alarm, *_ in rows]
+    
+    response = {
+        'records': records_with_alarms,
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    }
+    if include_total:
+        response['total'] = approximate_total(
+            ('caller_records', current_user_id, tab, search.strip()),
+            query.with_entities(Record.id)
         )
     
-    records = query.paginate(
-        page=page, per_page=50, error_out=False
-    )
+    return add_cache_validators(jsonify(response), etag)
+
+@app.route('/api/caller/record-counts', methods=['GET'])
+@jwt_required()
+def get_caller_record_counts():
+    """Record count of every dashboard tab, from one conditional aggregate"""
+    current_user_id = int(get_jwt_identity())
     
-    # Check if each record has an alarm
-    records_with_alarms = []
-    for r in records.items:
-        has_alarm = Reminder.query.filter_by(
-            record_id=r.id,
-            caller_id=current_user_id,
-            is_active=True
-        ).first() is not None
-        
-        records_with_alarms.append({
-            'id': r.id,
-            'phone_number': r.phone_number,
-            'name': r.name,
-            'response': r.response,
-            'notes': r.notes,
-            'visit': r.visit,
-            'has_alarm': has_alarm,
-            'updated_at': r.updated_at.isoformat() if r.updated_at else None
-        })
+    _, tab_filters = get_caller_tab_filters(current_user_id)
+    tabs = ['all'] + list(tab_filters)
     
-    return jsonify({
-        'records': records_with_alarms,
-        'total': records.total,
-        'pages': records.pages,
-        'current_page': page
-    })
+    counts = db.session.query(
+        db.func.count(Record.id),
+        *[db.func.count(Record.id).filter(condition) for condition in tab_filters.values()]
+    ).filter(
+        Record.caller_id == current_user_id,
+        Record.hidden_from_caller == False
+    ).one()
+    
+    return jsonify(dict(zip(tabs, counts)))
 
 @app.route('/api/records/<int:record_id>', methods=['PATCH'])
 @jwt_required()
@@ -730,18 +2571,149 @@ def update_record(record_id):
         return jsonify({'message': 'Access denied'}), 403
     
     data = request.get_json()
+    try:
+        expected_version = get_expected_version(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    if expected_version is not None and expected_version != record.version:
+        return version_conflict_response(record, 'Record')
+    
+    changes = {field: data[field] for field in ('name', 'response', 'notes') if field in data}
+    changes['updated_at'] = datetime.utcnow()
+    
+    # The stats deltas are computed from the record as loaded, so only update that version of it
+    version = versioned_update(Record, record_id, record.version, changes)
+    if version is None:
+        return version_conflict_response(record, 'Record')
+    if response_completion_changed(record.response, changes.get('response', record.response)):
+        mark_cache_tags(db.session, {'record_counts'})
+    
+    deltas = new_daily_stats_deltas()
+    add_response_delta(deltas, record.caller_id, record.updated_at, record.response, -1)
+    add_response_delta(deltas, record.caller_id, changes['updated_at'], changes.get('response', record.response), 1)
+    apply_daily_stats(deltas)
+    
+    events = []
+    log_call_event(events, record_id, current_user_id, record.response, changes.get('response', record.response), changes['updated_at'])
+    if events:
+        db.session.execute(db.insert(CallEvent), events)
+    db.session.commit()
+    invalidate_visit_notifications(record.caller_id)
     
-    if 'name' in data:
-        record.name = data['name']
-    if 'response' in data:
-        record.response = data['response']
-    if 'notes' in data:
-        record.notes = data['notes']
+    return jsonify({'message': 'Record updated successfully', 'version': version})
+
+@app.route('/api/records/batch', methods=['PATCH'])
+@jwt_required()
+def update_records_batch():
+    """Apply many record updates in one transaction: {"updates": [{"id": 1, "version": 3, "response": "...", "notes": "..."}, ...]}.
+    Returns a result per item; items that fail validation, ownership or their version check are skipped, the rest are applied."""
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
     
-    record.updated_at = datetime.utcnow()
-    db.session.commit()
+    data = request.get_json(silent=True) or {}
+    updates = data.get('updates')
+    if not isinstance(updates, list) or not updates:
+        return jsonify({'message': 'updates must be a non-empty list'}), 400
+    if len(updates) > app.config['RECORD_BATCH_MAX_ITEMS']:
+        return jsonify({'message': f'At most {app.config["RECORD_BATCH_MAX_ITEMS"]} updates per request'}), 400
+    
+    editable_fields = ('name', 'response', 'notes')
+    results = [None] * len(updates)
+    for index, item in enumerate(updates):
+        if not isinstance(item, dict) or not isinstance(item.get('id'), int) or isinstance(item['id'], bool):
+            results[index] = {'id': item.get('id') if isinstance(item, dict) else None, 'status': 'error', 'message': 'id is required'}
+        elif not any(field in item for field in editable_fields):
+            results[index] = {'id': item['id'], 'status': 'error', 'message': 'Nothing to update'}
+        else:
+            try:
+                get_expected_version(item)
+            except ValueError as e:
+                results[index] = {'id': item['id'], 'status': 'error', 'message': str(e)}
+    
+    # One query for ownership and the current values of every record in the batch. The rows stay
+    # locked until commit, so the versions checked here are the ones the UPDATE overwrites (and the
+    # rollup deltas and call events below describe real changes); id order avoids deadlocks.
+    record_ids = {item['id'] for item, result in zip(updates, results) if result is None}
+    current = {
+        row.id: row for row in db.session.query(
+            Record.id, Record.caller_id, Record.name, Record.response, Record.notes, Record.version, Record.updated_at
+        ).filter(Record.id.in_(record_ids)).order_by(Record.id).with_for_update()
+    } if record_ids else {}
+    
+    now = datetime.utcnow()
+    params = {}
+    for index, item in enumerate(updates):
+        if results[index]:
+            continue
+        
+        row = current.get(item['id'])
+        if not row:
+            results[index] = {'id': item['id'], 'status': 'error', 'message': 'Record not found'}
+            continue
+        # Callers can only update their own records
+        if user.role == 'caller' and row.caller_id != current_user_id:
+            results[index] = {'id': item['id'], 'status': 'error', 'message': 'Access denied'}
+            continue
+        if item.get('version') is not None and item['version'] != row.version:
+            results[index] = {
+                'id': item['id'], 'status': 'conflict', 'message': 'Record was changed by someone else',
+                'current': {'id': row.id, 'name': row.name, 'response': row.response, 'notes': row.notes, 'version': row.version}
+            }
+            continue
+        
+        # Every row carries the same columns so the batch is a single executemany UPDATE;
+        # later items for the same record win
+        values = params.get(item['id']) or {
+            'record_id': row.id, 'read_version': row.version,
+            'name': row.name, 'response': row.response, 'notes': row.notes
+        }
+        values.update({field: item[field] for field in editable_fields if field in item})
+        values['updated_at'] = now
+        params[item['id']] = values
+        results[index] = {'id': item['id'], 'status': 'updated', 'version': row.version + 1}
+    
+    try:
+        if params:
+            records = Record.__table__
+            statement = db.update(records).where(
+                records.c.id == db.bindparam('record_id'),
+                records.c.version == db.bindparam('read_version')
+            ).values(
+                name=db.bindparam('name'), response=db.bindparam('response'), notes=db.bindparam('notes'),
+                updated_at=db.bindparam('updated_at'), version=records.c.version + 1
+            )
+            db.session.execute(statement, list(params.values()))
+            
+            deltas = new_daily_stats_deltas()
+            events = []
+            for record_id, values in params.items():
+                row = current[record_id]
+                add_response_delta(deltas, row.caller_id, row.updated_at, row.response, -1)
+                add_response_delta(deltas, row.caller_id, now, values['response'], 1)
+                log_call_event(events, record_id, current_user_id, row.response, values['response'], now)
+                if response_completion_changed(row.response, values['response']):
+                    mark_cache_tags(db.session, {'record_counts'})
+            apply_daily_stats(deltas)
+            if events:
+                db.session.execute(db.insert(CallEvent), events)
+        db.session.commit()
+        # Only the callers whose records changed - no arguments would clear everyone's notifications
+        updated_caller_ids = {current[record_id].caller_id for record_id in params} - {None}
+        if updated_caller_ids:
+            invalidate_visit_notifications(*updated_caller_ids)
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Batch record update failed: {str(e)}", flush=True)
+        return jsonify({'message': f'Error updating records: {str(e)}'}), 500
     
-    return jsonify({'message': 'Record updated successfully'})
+    updated = sum(1 for result in results if result['status'] == 'updated')
+    return jsonify({
+        'message': f'{updated} of {len(updates)} records updated',
+        'updated': updated,
+        'failed': len(updates) - updated,
+        'results': results
+    })
 
 @app.route('/api/records/<int:record_id>', methods=['DELETE'])
 @jwt_required()
@@ -755,8 +2727,15 @@ def delete_record(record_id):
     if user.role == 'caller' and record.caller_id != current_user_id:
         return jsonify({'message': 'Access denied'}), 403
     
+    deltas = new_daily_stats_deltas()
+    add_record_deltas(deltas, record, -1)
+    apply_daily_stats(deltas)
+    caller_id = record.caller_id
+    if record.upload_job_id:
+        forget_upload_fingerprints([record.upload_job_id])
     db.session.delete(record)
     db.session.commit()
+    invalidate_visit_notifications(caller_id)
     
     return jsonify({'message': 'Record deleted successfully'})
 
@@ -784,6 +2763,7 @@ def get_all_caller_tasks():
             'description': task.description,
             'status': task.status,
             'progress': task.progress,
+            'version': task.version,
             'deadline': task.deadline.isoformat() if task.deadline else None,
             'created_at': task.created_at.isoformat(),
             'caller_name': user.name,
@@ -801,22 +2781,36 @@ def get_progress():
     if user.role not in ['admin', 'caller']:
         return jsonify({'message': 'Admin or Caller access required'}), 403
     
-    date_str = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
+    # The rollup is keyed by UTC date, like Record.updated_at
+    date_str = request.args.get('date', datetime.utcnow().strftime('%Y-%m-%d'))
     target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
     
-    callers = User.query.filter_by(role='caller').all()
+    # Progress only changes when the rollup is written or callers are added/removed
+    last_updated, stats_count, caller_count, last_caller_id = db.session.query(
+        db.select(db.func.max(CallerDailyStats.updated_at)).scalar_subquery(),
+        db.select(db.func.count()).select_from(CallerDailyStats).scalar_subquery(),
+        db.select(db.func.count(User.id)).where(User.role == 'caller').scalar_subquery(),
+        db.select(db.func.max(User.id)).where(User.role == 'caller').scalar_subquery()
+    ).one()
+    etag = get_list_etag(date_str, last_updated, stats_count, caller_count, last_caller_id)
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    
+    # Responses for the day (when the caller actually updated the record) and all-time assignments
+    stats = {
+        caller_id: (responses or 0, assigned or 0) for caller_id, responses, assigned in db.session.query(
+            CallerDailyStats.caller_id,
+            db.func.sum(CallerDailyStats.responses).filter(CallerDailyStats.date == target_date),
+            db.func.sum(CallerDailyStats.assigned)
+        ).group_by(CallerDailyStats.caller_id)
+    }
+    
+    callers = db.session.query(User.id, User.name).filter(User.role == 'caller').all()
     progress_data = []
     
     for caller in callers:
-        # Count responses for the day (when caller actually updated the record)
-        responses_today = Record.query.filter(
-            Record.caller_id == caller.id,
-            db.func.date(Record.updated_at) == target_date,
-            Record.response.isnot(None),
-            Record.response != ''
-        ).count()
-        
-        total_assigned = Record.query.filter_by(caller_id=caller.id).count()
+        responses_today, total_assigned = stats.get(caller.id, (0, 0))
         
         progress_data.append({
             'caller_id': caller.id,
@@ -827,9 +2821,53 @@ def get_progress():
             'percentage': min(100, (responses_today / 100) * 100) if responses_today else 0
         })
     
-    return jsonify({
+    return add_cache_validators(jsonify({
         'date': date_str,
         'progress': progress_data
+    }), etag)
+
+@app.route('/api/admin/call-activity', methods=['GET'])
+@jwt_required()
+def get_call_activity():
+    """Response changes per caller per day between start and end (inclusive, UTC dates), from call_events.
+    Defaults to the last 7 days. Callers only see their own activity."""
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    
+    if user.role not in ['admin', 'supervisor', 'caller']:
+        return jsonify({'message': 'Access denied'}), 403
+    
+    try:
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else datetime.utcnow().date()
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') else end - timedelta(days=6)
+    except ValueError:
+        return jsonify({'message': 'start and end must be YYYY-MM-DD dates'}), 400
+    if start > end:
+        return jsonify({'message': 'start must not be after end'}), 400
+    
+    # Range scan on the created_at index
+    day = db.func.date(CallEvent.created_at).label('day')
+    query = db.session.query(CallEvent.caller_id, User.name, day, db.func.count(CallEvent.id)).outerjoin(
+        User, User.id == CallEvent.caller_id
+    ).filter(
+        CallEvent.created_at >= datetime.combine(start, datetime.min.time()),
+        CallEvent.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+    )
+    if user.role == 'caller':
+        query = query.filter(CallEvent.caller_id == current_user_id)
+    rows = query.group_by(CallEvent.caller_id, User.name, day).order_by(day, CallEvent.caller_id).all()
+    
+    callers = {}
+    for caller_id, caller_name, _, calls in rows:
+        entry = callers.setdefault(caller_id, {'caller_id': caller_id, 'caller_name': caller_name, 'calls': 0})
+        entry['calls'] += calls
+    
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': [{'date': str(day), 'caller_id': caller_id, 'calls': calls} for caller_id, _, day, calls in rows],
+        'callers': list(callers.values()),
+        'total': sum(entry['calls'] for entry in callers.values())
     })
 
 @app.route('/api/visit/<int:record_id>', methods=['PATCH'])
@@ -847,7 +2885,7 @@ def mark_visit(record_id):
     if 'visit' in data:
         record.visit = data['visit']
         record.visit_by = current_user_id
-        record.updated_at = datetime.utcnow()
+        touch_record(record, datetime.utcnow())
         
         # Create admission record for confirmed visits
         if data['visit'] == 'confirmed':
@@ -874,6 +2912,7 @@ def mark_visit(record_id):
             db.session.add(admission)
         
         db.session.commit()
+        invalidate_visit_notifications(record.caller_id)
     
     return jsonify({'message': 'Visit status updated'})
 
@@ -933,9 +2972,10 @@ def create_other_admission(record_id):
     # Update record visit status to confirmed (since they enrolled)
     record.visit = 'confirmed'
     record.visit_by = current_user_id
-    record.updated_at = datetime.utcnow()
+    touch_record(record, datetime.utcnow())
     
     db.session.commit()
+    invalidate_visit_notifications(record.caller_id)
     
     return jsonify({'message': 'Other admission recorded successfully'})
 
@@ -1069,7 +3109,9 @@ def get_all_visits():
     if user.role != 'admin':
         return jsonify({'message': 'Admin access required'}), 403
     
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
+    include_total = request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes')
+    per_page = 15
     search_name = request.args.get('search_name', '').strip()
     search_phone = request.args.get('search_phone', '').strip()
     
@@ -1081,20 +3123,32 @@ def get_all_visits():
     )
     
     # Search filters
-    if search_name:
-        query = query.filter(Record.name.contains(search_name))
-    
-    if search_phone:
-        query = query.filter(Record.phone_number.contains(search_phone))
-    
-    # Order by most recent
-    query = query.order_by(Record.updated_at.desc())
+    query, relevance = search_records(query, [
+        ((Record.name,), search_name),
+        ((Record.phone_number,), search_phone)
+    ])
     
-    records = query.paginate(page=page, per_page=15, error_out=False)
+    try:
+        if relevance is not None:
+            # Best matches first, most recent among equals
+            rows, next_cursor = keyset_page(
+                query.add_columns(relevance), [relevance, Record.updated_at, Record.id],
+                lambda row: [row.relevance, row[0].updated_at, row[0].id],
+                cursor, per_page, descending=True
+            )
+            records = [row[0] for row in rows]
+        else:
+            # Most recent first - seek on (updated_at, id) instead of OFFSET
+            records, next_cursor = keyset_page(
+                query, [Record.updated_at, Record.id], lambda r: [r.updated_at, r.id],
+                cursor, per_page, descending=True
+            )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     # Get caller info for each record
     result_records = []
-    for record in records.items:
+    for record in records:
         caller = User.query.get(record.caller_id) if record.caller_id else None
         
         result_records.append({
@@ -1112,12 +3166,15 @@ def get_all_visits():
             'updated_at': record.updated_at.isoformat() if record.updated_at else None
         })
     
-    return jsonify({
+    response = {
         'records': result_records,
-        'total': records.total,
-        'pages': records.pages,
-        'current_page': page
-    })
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    }
+    if include_total:
+        response['total'] = approximate_total(('admin_visits', search_name, search_phone), query)
+    
+    return jsonify(response)
 
 @app.route('/api/admin/visited-records', methods=['GET'])
 @jwt_required()
@@ -1128,7 +3185,9 @@ def get_visited_records():
     if user.role != 'admin':
         return jsonify({'message': 'Admin access required'}), 403
     
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
+    include_total = request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes')
+    per_page = 15
     search_name = request.args.get('search_name', '').strip()
     search_phone = request.args.get('search_phone', '').strip()
     
@@ -1136,20 +3195,32 @@ def get_visited_records():
     query = Record.query.filter(Record.visit == 'visited')
     
     # Search filters
-    if search_name:
-        query = query.filter(Record.name.contains(search_name))
-    
-    if search_phone:
-        query = query.filter(Record.phone_number.contains(search_phone))
+    query, relevance = search_records(query, [
+        ((Record.name,), search_name),
+        ((Record.phone_number,), search_phone)
+    ])
     
-    # Order by most recent
-    query = query.order_by(Record.updated_at.desc())
-    
-    records = query.paginate(page=page, per_page=15, error_out=False)
+    try:
+        if relevance is not None:
+            # Best matches first, most recent among equals
+            rows, next_cursor = keyset_page(
+                query.add_columns(relevance), [relevance, Record.updated_at, Record.id],
+                lambda row: [row.relevance, row[0].updated_at, row[0].id],
+                cursor, per_page, descending=True
+            )
+            records = [row[0] for row in rows]
+        else:
+            # Most recent first - seek on (updated_at, id) instead of OFFSET
+            records, next_cursor = keyset_page(
+                query, [Record.updated_at, Record.id], lambda r: [r.updated_at, r.id],
+                cursor, per_page, descending=True
+            )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     # Get caller info for each record
     result_records = []
-    for record in records.items:
+    for record in records:
         caller = User.query.get(record.caller_id) if record.caller_id else None
         
         result_records.append({
@@ -1167,12 +3238,15 @@ def get_visited_records():
             'updated_at': record.updated_at.isoformat() if record.updated_at else None
         })
     
-    return jsonify({
+    response = {
         'records': result_records,
-        'total': records.total,
-        'pages': records.pages,
-        'current_page': page
-    })
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    }
+    if include_total:
+        response['total'] = approximate_total(('admin_visited_records', search_name, search_phone), query)
+    
+    return jsonify(response)
 
 @app.route('/api/admin/visit-stats', methods=['GET'])
 @jwt_required()
@@ -1183,38 +3257,29 @@ def get_visit_stats():
     if user.role not in ['admin', 'supervisor']:
         return jsonify({'message': 'Admin or Supervisor access required'}), 403
     
-    # Get visit statistics by caller
-    callers = User.query.filter_by(role='caller').all()
+    # Every count for every caller from one pass over records
+    has_response = db.and_(Record.response.isnot(None), Record.response != '')
+    counts = {
+        row.caller_id: row for row in db.session.query(
+            Record.caller_id,
+            db.func.count(Record.id).filter(has_response).label('responses'),
+            db.func.count(Record.id).filter(Record.visit == 'visited').label('visited'),
+            db.func.count(Record.id).filter(Record.visit == 'confirmed').label('confirmed'),
+            db.func.count(Record.id).filter(Record.visit == 'declined').label('declined'),
+            db.func.count(Record.id).filter(Record.visit == 'pending', has_response).label('pending')
+        ).group_by(Record.caller_id)
+    }
+    
+    callers = db.session.query(User.id, User.name).filter(User.role == 'caller').all()
     caller_stats = []
     
     for caller in callers:
-        total_responses = Record.query.filter(
-            Record.caller_id == caller.id,
-            Record.response.isnot(None),
-            Record.response != ''
-        ).count()
-        
-        visits_only = Record.query.filter(
-            Record.caller_id == caller.id,
-            Record.visit == 'visited'
-        ).count()
-        
-        visits_confirmed = Record.query.filter(
-            Record.caller_id == caller.id,
-            Record.visit == 'confirmed'
-        ).count()
-        
-        visits_declined = Record.query.filter(
-            Record.caller_id == caller.id,
-            Record.visit == 'declined'
-        ).count()
-        
-        visits_pending = Record.query.filter(
-            Record.caller_id == caller.id,
-            Record.visit == 'pending',
-            Record.response.isnot(None),
-            Record.response != ''
-        ).count()
+        row = counts.get(caller.id)
+        total_responses = row.responses if row else 0
+        visits_only = row.visited if row else 0
+        visits_confirmed = row.confirmed if row else 0
+        visits_declined = row.declined if row else 0
+        visits_pending = row.pending if row else 0
         
         # Total visits done = visited + confirmed (confirmed means they visited AND converted)
         total_visits_done = visits_only + visits_confirmed
@@ -1232,15 +3297,11 @@ def get_visit_stats():
             'conversion_rate': round(conversion_rate, 2)
         })
     
-    # Overall stats
-    total_visits_only = Record.query.filter_by(visit='visited').count()
-    total_visits_confirmed = Record.query.filter_by(visit='confirmed').count()
-    total_visits_declined = Record.query.filter_by(visit='declined').count()
-    total_visits_pending = Record.query.filter(
-        Record.visit == 'pending',
-        Record.response.isnot(None),
-        Record.response != ''
-    ).count()
+    # Overall stats - summed over every group, including records of non-callers and unassigned ones
+    total_visits_only = sum(row.visited for row in counts.values())
+    total_visits_confirmed = sum(row.confirmed for row in counts.values())
+    total_visits_declined = sum(row.declined for row in counts.values())
+    total_visits_pending = sum(row.pending for row in counts.values())
     
     # Total visits done = visited + confirmed
     total_visits_done = total_visits_only + total_visits_confirmed
@@ -1289,6 +3350,7 @@ def get_custom_users_progress():
                 'title': task.title,
                 'deadline': task.deadline.isoformat() if task.deadline else None,
                 'progress': task.progress,
+                'version': task.version,
                 'status': task.status,
                 'is_overdue': task.deadline and task.deadline < datetime.utcnow() and task.status != 'completed'
             })
@@ -1310,72 +3372,69 @@ def get_custom_users_progress():
         'total_custom_users': len(custom_users)
     })
 
-@app.route('/api/caller/visit-notifications', methods=['GET'])
-@jwt_required()
-def get_caller_visit_notifications():
-    current_user_id = int(get_jwt_identity())
-    user = User.query.get(current_user_id)
-    
-    if user.role != 'caller':
-        return jsonify({'message': 'Caller access required'}), 403
-    
-    # Get recent visits and confirmations for this caller
-    recent_visits = Record.query.filter(
-        Record.caller_id == current_user_id,
-        Record.visit == 'visited'
-    ).order_by(Record.updated_at.desc()).limit(10).all()
-    
-    recent_confirmations = Record.query.filter(
-        Record.caller_id == current_user_id,
-        Record.visit == 'confirmed'
-    ).order_by(Record.updated_at.desc()).limit(10).all()
-    
-    # Get caller's visit stats
-    visits_only = Record.query.filter(
-        Record.caller_id == current_user_id,
-        Record.visit == 'visited'
-    ).count()
-    
-    total_confirmed = Record.query.filter(
-        Record.caller_id == current_user_id,
-        Record.visit == 'confirmed'
-    ).count()
-    
-    total_declined = Record.query.filter(
-        Record.caller_id == current_user_id,
-        Record.visit == 'declined'
-    ).count()
-    
-    pending_visits = Record.query.filter(
-        Record.caller_id == current_user_id,
-        Record.visit == 'pending',
-        Record.response.isnot(None),
-        Record.response != ''
-    ).count()
+def build_visit_notifications(caller_id):
+    """Recent visits, confirmations and visit stats of one caller"""
+    # Caller's visit stats in one pass
+    visits_only, total_confirmed, total_declined, pending_visits = db.session.query(
+        db.func.count(Record.id).filter(Record.visit == 'visited'),
+        db.func.count(Record.id).filter(Record.visit == 'confirmed'),
+        db.func.count(Record.id).filter(Record.visit == 'declined'),
+        db.func.count(Record.id).filter(
+            Record.visit == 'pending',
+            Record.response.isnot(None),
+            Record.response != ''
+        )
+    ).filter(Record.caller_id == caller_id).one()
+    
+    # 10 most recent visits and confirmations in one query, ranked within each status
+    rank = db.func.row_number().over(
+        partition_by=Record.visit,
+        order_by=(Record.updated_at.desc(), Record.id.desc())
+    ).label('rank')
+    ranked = db.session.query(
+        Record.id, Record.phone_number, Record.name, Record.visit, Record.updated_at, rank
+    ).filter(
+        Record.caller_id == caller_id,
+        Record.visit.in_(['visited', 'confirmed'])
+    ).subquery()
+    recent = db.session.query(ranked).filter(ranked.c.rank <= 10).order_by(ranked.c.visit, ranked.c.rank).all()
     
     # Total visits done = visited + confirmed
     total_visits_done = visits_only + total_confirmed
     
-    return jsonify({
-        'recent_visits': [{
-            'id': v.id,
-            'phone_number': v.phone_number,
-            'name': v.name,
-            'updated_at': v.updated_at.isoformat() if v.updated_at else None
-        } for v in recent_visits],
-        'recent_confirmations': [{
+    def serialize(visit):
+        return [{
             'id': v.id,
             'phone_number': v.phone_number,
             'name': v.name,
             'updated_at': v.updated_at.isoformat() if v.updated_at else None
-        } for v in recent_confirmations],
+        } for v in recent if v.visit == visit]
+    
+    return {
+        'recent_visits': serialize('visited'),
+        'recent_confirmations': serialize('confirmed'),
         'stats': {
             'total_visits_done': total_visits_done,
             'total_confirmed': total_confirmed,
             'total_declined': total_declined,
             'pending_visits': pending_visits
         }
-    })
+    }
+
+@app.route('/api/caller/visit-notifications', methods=['GET'])
+@jwt_required()
+def get_caller_visit_notifications():
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    
+    if user.role != 'caller':
+        return jsonify({'message': 'Caller access required'}), 403
+    
+    return cached_json(
+        'visit_notifications', ['visit_notifications', f'visit_notifications:{current_user_id}'],
+        lambda: build_visit_notifications(current_user_id),
+        key_parts=(current_user_id,), ttl=app.config['VISIT_NOTIFICATIONS_TTL']
+    )
 
 # Caller Tasks Routes (Todo-style)
 @app.route('/api/caller/tasks', methods=['GET'])
@@ -1397,6 +3456,7 @@ def get_caller_tasks():
             'description': task.description,
             'status': task.status,
             'progress': task.progress,
+            'version': task.version,
             'deadline': task.deadline.isoformat() if task.deadline else None,
             'created_at': task.created_at.isoformat(),
             'assigned_by_name': User.query.get(task.assigned_by).name if task.assigned_by else 'System'
@@ -1450,20 +3510,20 @@ def update_caller_task(task_id):
         return jsonify({'message': 'Access denied'}), 403
     
     data = request.get_json()
+    try:
+        expected_version = get_expected_version(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    if 'status' in data:
-        task.status = data['status']
-    if 'progress' in data:
-        task.progress = data['progress']
-    if 'title' in data:
-        task.title = data['title']
-    if 'description' in data:
-        task.description = data['description']
+    changes = {field: data[field] for field in ('status', 'progress', 'title', 'description') if field in data}
+    changes['updated_at'] = datetime.utcnow()
     
-    task.updated_at = datetime.utcnow()
+    version = versioned_update(Task, task_id, expected_version, changes)
+    if version is None:
+        return version_conflict_response(task, 'Task')
     db.session.commit()
     
-    return jsonify({'message': 'Task updated successfully'})
+    return jsonify({'message': 'Task updated successfully', 'version': version})
 
 # Task Routes
 @app.route('/api/tasks', methods=['POST'])
@@ -1496,24 +3556,15 @@ def get_tasks():
     current_user_id = int(get_jwt_identity())
     user = User.query.get(current_user_id)
     
-    if user.role == 'admin':
-        tasks = Task.query.all()
-    else:
-        tasks = Task.query.filter_by(assigned_to=current_user_id).all()
+    query = db.select(
+        Task.id, Task.title, Task.description, Task.assigned_to, Task.assigned_by, Task.deadline,
+        Task.status, Task.progress, Task.version, Task.created_at, Task.updated_at
+    )
+    if user.role != 'admin':
+        query = query.where(Task.assigned_to == current_user_id)
     
     return jsonify({
-        'tasks': [{
-            'id': t.id,
-            'title': t.title,
-            'description': t.description,
-            'assigned_to': t.assigned_to,
-            'assigned_by': t.assigned_by,
-            'deadline': t.deadline.isoformat() if t.deadline else None,
-            'status': t.status,
-            'progress': t.progress,
-            'created_at': t.created_at.isoformat(),
-            'updated_at': t.updated_at.isoformat()
-        } for t in tasks]
+        'tasks': fetch_dicts(query)
     })
 
 @app.route('/api/tasks/<int:task_id>', methods=['PATCH'])
@@ -1529,25 +3580,24 @@ def update_task(task_id):
         return jsonify({'message': 'Access denied'}), 403
     
     data = request.get_json()
+    try:
+        expected_version = get_expected_version(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    if 'status' in data:
-        task.status = data['status']
-    if 'progress' in data:
-        task.progress = data['progress']
+    changes = {field: data[field] for field in ('status', 'progress') if field in data}
     if user.role == 'admin':
-        if 'title' in data:
-            task.title = data['title']
-        if 'description' in data:
-            task.description = data['description']
-        if 'assigned_to' in data:
-            task.assigned_to = data['assigned_to']
+        changes.update({field: data[field] for field in ('title', 'description', 'assigned_to') if field in data})
         if 'deadline' in data:
-            task.deadline = datetime.fromisoformat(data['deadline']) if data['deadline'] else None
+            changes['deadline'] = datetime.fromisoformat(data['deadline']) if data['deadline'] else None
+    changes['updated_at'] = datetime.utcnow()
     
-    task.updated_at = datetime.utcnow()
+    version = versioned_update(Task, task_id, expected_version, changes)
+    if version is None:
+        return version_conflict_response(task, 'Task')
     db.session.commit()
     
-    return jsonify({'message': 'Task updated successfully'})
+    return jsonify({'message': 'Task updated successfully', 'version': version})
 
 @app.route('/api/tasks/self', methods=['POST'])
 @jwt_required()
@@ -1667,19 +3717,23 @@ def calls_report():
     if user.role != 'admin':
         return jsonify({'message': 'Admin access required'}), 403
     
-    # Get call statistics
-    total_records = Record.query.count()
-    completed_calls = Record.query.filter(Record.response.isnot(None), Record.response != '').count()
-    visits_confirmed = Record.query.filter_by(visit='confirmed').count()
-    visits_declined = Record.query.filter_by(visit='declined').count()
+    def compute():
+        # Get call statistics
+        total_records = Record.query.count()
+        completed_calls = Record.query.filter(Record.response.isnot(None), Record.response != '').count()
+        visits_confirmed = Record.query.filter_by(visit='confirmed').count()
+        visits_declined = Record.query.filter_by(visit='declined').count()
+        
+        return {
+            'total_records': total_records,
+            'completed_calls': completed_calls,
+            'visits_confirmed': visits_confirmed,
+            'visits_declined': visits_declined,
+            'completion_rate': (completed_calls / total_records * 100) if total_records > 0 else 0
+        }
     
-    return jsonify({
-        'total_records': total_records,
-        'completed_calls': completed_calls,
-        'visits_confirmed': visits_confirmed,
-        'visits_declined': visits_declined,
-        'completion_rate': (completed_calls / total_records * 100) if total_records > 0 else 0
-    })
+    # Editing a response that was already set doesn't change any of these counts
+    return cached_json('calls_report', ['record_counts'], compute)
 
 @app.route('/api/reports/tasks', methods=['GET'])
 @jwt_required()
@@ -1690,20 +3744,24 @@ def tasks_report():
     if user.role != 'admin':
         return jsonify({'message': 'Admin access required'}), 403
     
-    # Get task statistics
-    total_tasks = Task.query.count()
-    completed_tasks = Task.query.filter_by(status='completed').count()
-    overdue_tasks = Task.query.filter(
-        Task.deadline < datetime.utcnow(),
-        Task.status != 'completed'
-    ).count()
+    def compute():
+        # Get task statistics
+        total_tasks = Task.query.count()
+        completed_tasks = Task.query.filter_by(status='completed').count()
+        overdue_tasks = Task.query.filter(
+            Task.deadline < datetime.utcnow(),
+            Task.status != 'completed'
+        ).count()
+        
+        return {
+            'total_tasks': total_tasks,
+            'completed_tasks': completed_tasks,
+            'overdue_tasks': overdue_tasks,
+            'completion_rate': (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        }
     
-    return jsonify({
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'overdue_tasks': overdue_tasks,
-        'completion_rate': (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-    })
+    # Tasks becoming overdue is not a write, so the TTL bounds how late overdue_tasks can be
+    return cached_json('tasks_report', ['tasks'], compute)
 
 # Role Management Routes
 @app.route('/api/admin/roles', methods=['GET'])
@@ -1715,11 +3773,24 @@ def get_roles():
     if user.role != 'admin':
         return jsonify({'message': 'Admin access required'}), 403
     
-    # Get all unique roles from users table
-    roles = db.session.query(User.role).distinct().all()
-    role_list = [role[0] for role in roles]
+    def compute():
+        # Get all unique roles from users table
+        roles = db.session.query(User.role).distinct().all()
+        return {'roles': [role[0] for role in roles]}
+    
+    return cached_json('roles', ['users'], compute)
+
+@app.route('/api/admin/cache-stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """Hit rates of the app cache per endpoint, for tuning TTLs. Counted per process."""
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
     
-    return jsonify({'roles': role_list})
+    if user.role != 'admin':
+        return jsonify({'message': 'Admin access required'}), 403
+    
+    return jsonify(app_cache.stats())
 
 @app.route('/api/admin/roles', methods=['POST'])
 @jwt_required()
@@ -1789,6 +3860,7 @@ def custom_dashboard():
             'deadline': t.deadline.isoformat() if t.deadline else None,
             'status': t.status,
             'progress': t.progress,
+            'version': t.version,
             'created_at': t.created_at.isoformat(),
             'updated_at': t.updated_at.isoformat(),
             'assigned_by_name': User.query.get(t.assigned_by).name if t.assigned_by else 'Unknown'
@@ -1817,10 +3889,13 @@ def clear_records_only():
         # Delete admissions first (foreign key constraint)
         Admission.query.delete()
         
-        # Then delete phone records
+        # Then delete phone records and their rollup
         records_deleted = Record.query.delete()
+        CallerDailyStats.query.delete()
+        forget_upload_fingerprints()
         
         db.session.commit()
+        invalidate_visit_notifications()
         
         return jsonify({
             'message': 'Phone records cleared successfully',
@@ -1842,17 +3917,13 @@ def get_certified_office_assistant():
     if user.role != 'admin':
         return jsonify({'message': 'Admin access required'}), 403
     
-    admissions = CertifiedOfficeAssistant.query.order_by(CertifiedOfficeAssistant.created_at.desc()).all()
+    admissions = fetch_dicts(db.select(
+        CertifiedOfficeAssistant.id, CertifiedOfficeAssistant.phone_number, CertifiedOfficeAssistant.name,
+        CertifiedOfficeAssistant.caller_name, CertifiedOfficeAssistant.response, CertifiedOfficeAssistant.created_at
+    ).order_by(CertifiedOfficeAssistant.created_at.desc()))
     
     return jsonify({
-        'admissions': [{
-            'id': a.id,
-            'phone_number': a.phone_number,
-            'name': a.name,
-            'caller_name': a.caller_name,
-            'response': a.response,
-            'created_at': a.created_at.isoformat()
-        } for a in admissions],
+        'admissions': admissions,
         'total': len(admissions)
     })
 
@@ -1867,6 +3938,10 @@ def update_other_admission(admission_id):
     
     admission = OtherAdmissions.query.get_or_404(admission_id)
     data = request.get_json()
+    try:
+        expected_version = get_expected_version(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     # Parse dates if provided
     course_start_date = None
@@ -1877,18 +3952,21 @@ def update_other_admission(admission_id):
         course_end_date = datetime.fromisoformat(data['course_end_date'])
     
     # Update fields
-    admission.discount_rate = data.get('discount_rate')
-    admission.total_fees = data.get('course_total_fees')
-    admission.enrolled_course = data.get('enrolled_course')
-    admission.fees_paid = data.get('fees_paid')
-    admission.course_total_fees = data.get('course_total_fees')
-    admission.course_start_date = course_start_date
-    admission.course_end_date = course_end_date
-    admission.payment_mode = data.get('payment_mode')
-    
+    version = versioned_update(OtherAdmissions, admission_id, expected_version, {
+        'discount_rate': data.get('discount_rate'),
+        'total_fees': data.get('course_total_fees'),
+        'enrolled_course': data.get('enrolled_course'),
+        'fees_paid': data.get('fees_paid'),
+        'course_total_fees': data.get('course_total_fees'),
+        'course_start_date': course_start_date,
+        'course_end_date': course_end_date,
+        'payment_mode': data.get('payment_mode')
+    })
+    if version is None:
+        return version_conflict_response(admission, 'Admission')
     db.session.commit()
     
-    return jsonify({'message': 'Admission updated successfully'})
+    return jsonify({'message': 'Admission updated successfully', 'version': version})
 
 @app.route('/api/admin/other-admission/<int:admission_id>', methods=['DELETE'])
 @jwt_required()
@@ -1914,45 +3992,36 @@ def get_transactions():
     if user.role not in ['admin', 'supervisor']:
         return jsonify({'message': 'Admin or Supervisor access required'}), 403
     
-    transactions = Transaction.query.order_by(Transaction.created_at.desc()).all()
-    
-    # Calculate totals
-    total_earned = db.session.query(db.func.sum(Transaction.amount)).filter_by(type='earn').scalar() or 0
-    total_spent = db.session.query(db.func.sum(Transaction.amount)).filter_by(type='spend').scalar() or 0
-    
-    # Add automatic earnings from student fees
-    student_fees = db.session.query(db.func.sum(OtherAdmissions.fees_paid)).scalar() or 0
-    total_earned += student_fees
-    
-    # Add student fees as automatic transactions in response
-    if student_fees > 0:
-        transactions_list = [{
-            'id': 'auto_fees',
-            'type': 'earn',
-            'amount': student_fees,
-            'description': 'Student Course Fees (Auto)',
-            'created_at': datetime.utcnow().isoformat()
-        }] + [{
-            'id': t.id,
-            'type': t.type,
-            'amount': t.amount,
-            'description': t.description,
-            'created_at': t.created_at.isoformat()
-        } for t in transactions]
-    else:
-        transactions_list = [{
-            'id': t.id,
-            'type': t.type,
-            'amount': t.amount,
-            'description': t.description,
-            'created_at': t.created_at.isoformat()
-        } for t in transactions]
+    def compute():
+        transactions = fetch_dicts(db.select(
+            Transaction.id, Transaction.type, Transaction.amount, Transaction.description, Transaction.created_at
+        ).order_by(Transaction.created_at.desc()))
+        
+        # Calculate totals
+        total_earned = db.session.query(db.func.sum(Transaction.amount)).filter_by(type='earn').scalar() or 0
+        total_spent = db.session.query(db.func.sum(Transaction.amount)).filter_by(type='spend').scalar() or 0
+        
+        # Add automatic earnings from student fees
+        student_fees = db.session.query(db.func.sum(OtherAdmissions.fees_paid)).scalar() or 0
+        total_earned += student_fees
+        
+        # Add student fees as automatic transactions in response
+        if student_fees > 0:
+            transactions.insert(0, {
+                'id': 'auto_fees',
+                'type': 'earn',
+                'amount': student_fees,
+                'description': 'Student Course Fees (Auto)',
+                'created_at': datetime.utcnow()
+            })
+        
+        return {
+            'transactions': transactions,
+            'total_earned': total_earned,
+            'total_spent': total_spent
+        }
     
-    return jsonify({
-        'transactions': transactions_list,
-        'total_earned': total_earned,
-        'total_spent': total_spent
-    })
+    return cached_json('transactions', ['transactions', 'other_admissions'], compute)
 
 @app.route('/api/admin/transactions', methods=['POST'])
 @jwt_required()
@@ -1986,25 +4055,16 @@ def get_other_admissions_list():
     if user.role not in ['admin', 'supervisor']:
         return jsonify({'message': 'Admin or Supervisor access required'}), 403
     
-    admissions = OtherAdmissions.query.order_by(OtherAdmissions.created_at.desc()).all()
+    admissions = fetch_dicts(db.select(
+        OtherAdmissions.id, OtherAdmissions.phone_number, OtherAdmissions.name, OtherAdmissions.caller_name,
+        OtherAdmissions.response, OtherAdmissions.discount_rate, OtherAdmissions.total_fees,
+        OtherAdmissions.enrolled_course, OtherAdmissions.fees_paid, OtherAdmissions.version,
+        OtherAdmissions.course_total_fees, OtherAdmissions.course_start_date, OtherAdmissions.course_end_date,
+        OtherAdmissions.payment_mode, OtherAdmissions.created_at
+    ).order_by(OtherAdmissions.created_at.desc()))
     
     return jsonify({
-        'admissions': [{
-            'id': a.id,
-            'phone_number': a.phone_number,
-            'name': a.name,
-            'caller_name': a.caller_name,
-            'response': a.response,
-            'discount_rate': a.discount_rate,
-            'total_fees': a.total_fees,
-            'enrolled_course': a.enrolled_course,
-            'fees_paid': a.fees_paid,
-            'course_total_fees': a.course_total_fees,
-            'course_start_date': a.course_start_date.isoformat() if a.course_start_date else None,
-            'course_end_date': a.course_end_date.isoformat() if a.course_end_date else None,
-            'payment_mode': a.payment_mode,
-            'created_at': a.created_at.isoformat()
-        } for a in admissions],
+        'admissions': admissions,
         'total': len(admissions)
     })
 
@@ -2380,7 +4440,7 @@ def serve_static_files(path):
     if '.' in path:
         print(f"Static file requested: {path}")
         try:
-            return send_from_directory(app.static_folder, path)
+            return send_frontend_file(path)
         except Exception as e:
             print(f"Static file not found: {path}, error: {e}")
             return jsonify({'error': 'File not found'}), 404
@@ -2389,6 +4449,12 @@ def serve_static_files(path):
     print(f"Unknown route: {path}")
     return jsonify({'error': 'Route not found'}), 404
 
+# Flask's own static route (/<path:filename>, added because static_url_path is '') matches
+# before the catch-all above, so point it there too to get precompression and cache headers
+@app.endpoint('static')
+def serve_build_file(filename):
+    return serve_static_files(filename)
+
 def send_reminder_email(caller_email, caller_name, record, trigger_type, scheduled_time):
     """Send reminder email to caller"""
     try:
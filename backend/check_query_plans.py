@@ -0,0 +1,105 @@
+"""
+Query plan check for the hot query paths.
+EXPLAINs the queries behind the caller dashboard, reminders, tasks, the
+admin visit lists and call activity reports and exits with status 1 if any of
+them scans a whole table instead of using an index. Run it after
+`flask db upgrade` (or in CI) to catch a missing or unusable index before it
+reaches production:
+
+    python backend/check_query_plans.py
+
+On PostgreSQL sequential scans are disabled for the check (SET LOCAL
+enable_seqscan = off), so small tables still report whether an index *can*
+serve the query. On SQLite the EXPLAIN QUERY PLAN output is checked instead.
+"""
+import os
+import sys
+
+# Add parent directory to path to import app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, CallEvent, Record, Reminder, ReminderQueue, Task
+from datetime import datetime
+from sqlalchemy import text
+
+def hot_queries():
+    """(description, query) pairs shaped like the queries the endpoints run"""
+    return [
+        ('caller records tab', db.session.query(Record.id).filter(
+            Record.caller_id == 1,
+            Record.hidden_from_caller == False,
+            Record.visit == 'visited'
+        ).order_by(Record.id).limit(51)),
+        ('admin visited records', db.session.query(Record.id).filter(
+            Record.visit == 'visited'
+        ).order_by(Record.updated_at.desc(), Record.id.desc()).limit(16)),
+        ('upload duplicate check', db.session.query(Record.id).filter(
+            Record.phone_normalized == '9876543210'
+        )),
+        ('caller alarms', db.session.query(Reminder.record_id).filter(
+            Reminder.caller_id == 1,
+            Reminder.is_active == True
+        )),
+        ('reminder popups', db.session.query(ReminderQueue.id).filter(
+            ReminderQueue.caller_id == 1,
+            ReminderQueue.is_dismissed == False
+        )),
+        ('caller tasks', db.session.query(Task.id).filter(
+            Task.assigned_to == 1,
+            Task.status == 'pending'
+        )),
+        ('call activity range', db.session.query(CallEvent.caller_id).filter(
+            CallEvent.created_at >= datetime(2024, 1, 1),
+            CallEvent.created_at < datetime(2024, 1, 8)
+        )),
+    ]
+
+def find_seq_scans(plan):
+    """Tables read by a Seq Scan anywhere in a PostgreSQL JSON plan"""
+    tables = []
+    if plan.get('Node Type') == 'Seq Scan':
+        tables.append(plan.get('Relation Name'))
+    for child in plan.get('Plans', []):
+        tables.extend(find_seq_scans(child))
+    return tables
+
+def explain_full_scans(query):
+    """Tables a query would scan in full"""
+    connection = db.session.connection()
+    sql = str(query.statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        return find_seq_scans(plan[0]['Plan'])
+
+    # SQLite: "SCAN records" is a full scan, "SEARCH ..." or "SCAN ... USING INDEX" is not
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return [
+        row[-1].split()[1] for row in rows
+        if row[-1].startswith('SCAN ') and 'USING' not in row[-1]
+    ]
+
+def check_query_plans():
+    with app.app_context():
+        failures = []
+        for description, query in hot_queries():
+            full_scans = explain_full_scans(query)
+            db.session.rollback()
+
+            if full_scans:
+                failures.append(description)
+                print(f"❌ {description}: sequential scan on {', '.join(full_scans)}")
+            else:
+                print(f"✅ {description}: uses an index")
+
+        if failures:
+            print(f"\n❌ {len(failures)} hot query plan(s) regressed to a sequential scan")
+            print("   Run `flask db upgrade` or add the missing index in backend/migrations")
+            return False
+
+        print("\n✅ All hot query plans use indexes")
+        return True
+
+if __name__ == '__main__':
+    sys.exit(0 if check_query_plans() else 1)
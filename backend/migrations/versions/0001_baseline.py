@@ -0,0 +1,149 @@
+"""Baseline - the core tables as they were before managed migrations
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 14:30:00.000000
+
+On an empty database this creates the tables the app started out with, so a
+fresh `flask db upgrade` builds the whole schema. Databases that predate
+managed migrations already have them (from db.create_all()) and every table
+that exists is left alone. Later additions - indexes, version columns, the
+upload tables, phone_normalized - are their own revisions.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLES = [
+    'users', 'records', 'tasks', 'certified_office_assistant', 'transactions',
+    'other_admissions', 'admissions', 'reminders', 'reminder_queue',
+]
+
+
+def create_table(inspector, name, *columns):
+    if not inspector.has_table(name):
+        op.create_table(name, *columns)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    create_table(
+        inspector, 'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('username', sa.String(50), nullable=False, unique=True),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('role', sa.String(50), nullable=False),
+        sa.Column('created_at', sa.DateTime())
+    )
+    create_table(
+        inspector, 'records',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('caller_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('phone_number', sa.String(20), nullable=False),
+        sa.Column('name', sa.String(100)),
+        sa.Column('response', sa.Text()),
+        sa.Column('notes', sa.Text()),
+        sa.Column('visit', sa.Enum('visited', 'confirmed', 'declined', 'pending', name='visit_status')),
+        sa.Column('visit_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('hidden_from_caller', sa.Boolean()),
+        sa.Column('assigned_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime())
+    )
+    create_table(
+        inspector, 'tasks',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('assigned_to', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('assigned_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('deadline', sa.DateTime()),
+        sa.Column('status', sa.Enum('pending', 'in_progress', 'completed', 'overdue', name='task_status')),
+        sa.Column('progress', sa.Integer()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime())
+    )
+    create_table(
+        inspector, 'certified_office_assistant',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('record_id', sa.Integer(), sa.ForeignKey('records.id'), nullable=False),
+        sa.Column('phone_number', sa.String(20), nullable=False),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('caller_name', sa.String(100), nullable=False),
+        sa.Column('response', sa.Text()),
+        sa.Column('processed_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime())
+    )
+    create_table(
+        inspector, 'transactions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('type', sa.Enum('earn', 'spend', name='transaction_type'), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(200), nullable=False),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime())
+    )
+    create_table(
+        inspector, 'other_admissions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('record_id', sa.Integer(), sa.ForeignKey('records.id'), nullable=True),
+        sa.Column('phone_number', sa.String(20), nullable=False),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('caller_name', sa.String(100), nullable=True),
+        sa.Column('response', sa.Text()),
+        sa.Column('discount_rate', sa.Float(), nullable=True),
+        sa.Column('total_fees', sa.Float(), nullable=True),
+        sa.Column('enrolled_course', sa.String(200), nullable=True),
+        sa.Column('fees_paid', sa.Integer(), nullable=True),
+        sa.Column('course_total_fees', sa.Integer(), nullable=True),
+        sa.Column('course_start_date', sa.DateTime(), nullable=True),
+        sa.Column('course_end_date', sa.DateTime(), nullable=True),
+        sa.Column('payment_mode', sa.String(100), nullable=True),
+        sa.Column('source_of_reach', sa.String(200), nullable=True),
+        sa.Column('processed_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime())
+    )
+    create_table(
+        inspector, 'admissions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('record_id', sa.Integer(), sa.ForeignKey('records.id'), nullable=False),
+        sa.Column('admission_type', sa.Enum('confirmed', 'other', name='admission_type'), nullable=False),
+        sa.Column('discount_rate', sa.Float(), nullable=True),
+        sa.Column('total_fees', sa.Float(), nullable=True),
+        sa.Column('enrolled_course', sa.String(200), nullable=True),
+        sa.Column('processed_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime())
+    )
+    create_table(
+        inspector, 'reminders',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('record_id', sa.Integer(), sa.ForeignKey('records.id'), nullable=False),
+        sa.Column('caller_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('scheduled_datetime', sa.DateTime(), nullable=False),
+        sa.Column('reminder_17h_triggered', sa.Boolean()),
+        sa.Column('reminder_exact_triggered', sa.Boolean()),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime())
+    )
+    create_table(
+        inspector, 'reminder_queue',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('reminder_id', sa.Integer(), sa.ForeignKey('reminders.id'), nullable=False),
+        sa.Column('caller_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('trigger_type', sa.Enum('17h_before', 'exact_time', name='trigger_type'), nullable=False),
+        sa.Column('triggered_at', sa.DateTime()),
+        sa.Column('is_dismissed', sa.Boolean())
+    )
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.drop_table(table)
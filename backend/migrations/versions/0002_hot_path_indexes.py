@@ -0,0 +1,68 @@
+"""Indexes for the hot query paths and trigram search
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 14:35:00.000000
+
+Built with CREATE INDEX CONCURRENTLY on PostgreSQL so records, reminders and
+tasks stay writable while the indexes build. CONCURRENTLY cannot run inside a
+transaction, hence the autocommit block. IF NOT EXISTS keeps the revision safe
+on databases where db.create_all() already created them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_path_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # Caller dashboard listing and tab filters
+    ('ix_records_caller_hidden_visit', 'records', ['caller_id', 'hidden_from_caller', 'visit']),
+    # Admin visit lists, newest first
+    ('ix_records_updated_at', 'records', ['updated_at']),
+    # Alarm flags and the alarms tab
+    ('ix_reminders_caller_active', 'reminders', ['caller_id', 'is_active']),
+    # Pending reminder popups
+    ('ix_reminder_queue_caller_dismissed', 'reminder_queue', ['caller_id', 'is_dismissed']),
+    # Task lists per assignee and status
+    ('ix_tasks_assigned_status', 'tasks', ['assigned_to', 'status']),
+]
+
+TRIGRAM_INDEXES = [
+    ('ix_records_name_trgm', 'records', 'name'),
+    ('ix_records_phone_number_trgm', 'records', 'phone_number'),
+]
+
+
+def upgrade():
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+        if is_postgres:
+            op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for name, table, column in TRIGRAM_INDEXES:
+                op.create_index(
+                    name, table, [column], if_not_exists=True,
+                    postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True
+                )
+
+
+def downgrade():
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+
+    with op.get_context().autocommit_block():
+        if is_postgres:
+            for name, table, column in TRIGRAM_INDEXES:
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+        for name, table, columns in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
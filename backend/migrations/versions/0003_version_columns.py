@@ -0,0 +1,42 @@
+"""Version columns for optimistic concurrency on records, tasks and admissions
+
+Revision ID: 0003_version_columns
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-18 16:10:00.000000
+
+Every row starts at version 1; updates bump it and only apply when the client
+still holds the version it read. The server default fills existing rows
+without a table rewrite on PostgreSQL 11+. Columns that db.create_all()
+already added on a fresh database are left alone.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_version_columns'
+down_revision = '0002_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+TABLES = ['records', 'tasks', 'other_admissions']
+
+
+def has_version_column(table):
+    columns = sa.inspect(op.get_bind()).get_columns(table)
+    return any(column['name'] == 'version' for column in columns)
+
+
+def upgrade():
+    for table in TABLES:
+        if not has_version_column(table):
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in TABLES:
+        if has_version_column(table):
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.drop_column('version')
@@ -0,0 +1,57 @@
+"""Daily caller stats rollup
+
+Revision ID: 0004_caller_daily_stats
+Revises: 0003_version_columns
+Create Date: 2026-10-18 17:05:00.000000
+
+caller_daily_stats holds, per caller and UTC day, the records with a response
+last updated that day and the records assigned that day. The app keeps it in
+step on every record write (apply_daily_stats); this revision creates it and
+fills it from the existing records. The backfill recomputes from scratch, so it
+is also correct if db.create_all() created the table before the upgrade ran.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_caller_daily_stats'
+down_revision = '0003_version_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('caller_daily_stats'):
+        op.create_table(
+            'caller_daily_stats',
+            sa.Column('caller_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('date', sa.Date(), primary_key=True),
+            sa.Column('responses', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('assigned', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime())
+        )
+
+    op.execute("DELETE FROM caller_daily_stats")
+    op.execute("""
+        INSERT INTO caller_daily_stats (caller_id, date, responses, assigned, updated_at)
+        SELECT caller_id, day, SUM(responses), SUM(assigned), CURRENT_TIMESTAMP
+        FROM (
+            SELECT caller_id, DATE(updated_at) AS day, COUNT(*) AS responses, 0 AS assigned
+            FROM records
+            WHERE caller_id IS NOT NULL AND updated_at IS NOT NULL
+              AND response IS NOT NULL AND response != ''
+            GROUP BY caller_id, DATE(updated_at)
+            UNION ALL
+            SELECT caller_id, DATE(COALESCE(assigned_at, updated_at)) AS day, 0 AS responses, COUNT(*) AS assigned
+            FROM records
+            WHERE caller_id IS NOT NULL AND COALESCE(assigned_at, updated_at) IS NOT NULL
+            GROUP BY caller_id, DATE(COALESCE(assigned_at, updated_at))
+        ) AS counts
+        GROUP BY caller_id, day
+    """)
+
+
+def downgrade():
+    op.drop_table('caller_daily_stats')
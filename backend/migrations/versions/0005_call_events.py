@@ -0,0 +1,43 @@
+"""Append-only call event log
+
+Revision ID: 0005_call_events
+Revises: 0004_caller_daily_stats
+Create Date: 2026-10-18 17:40:00.000000
+
+One row per response change, written alongside the record update. Rows only
+ever arrive in time order, so created_at gets a BRIN index on PostgreSQL
+(a regular index elsewhere), which keeps date range reports on an index scan
+without the write and storage cost of a B-tree on a table that only grows.
+There is no history to backfill - records only hold their latest response.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_call_events'
+down_revision = '0004_caller_daily_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('call_events'):
+        return
+
+    op.create_table(
+        'call_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True),
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('caller_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('old_response', sa.Text()),
+        sa.Column('new_response', sa.Text()),
+        sa.Column('created_at', sa.DateTime(), nullable=False)
+    )
+    op.create_index('ix_call_events_record_id', 'call_events', ['record_id'])
+    op.create_index('ix_call_events_created_at', 'call_events', ['created_at'], postgresql_using='brin')
+
+
+def downgrade():
+    op.drop_table('call_events')
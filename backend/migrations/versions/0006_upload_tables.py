@@ -0,0 +1,112 @@
+"""Upload staging, job, session and fingerprint tables
+
+Revision ID: 0006_upload_tables
+Revises: 0005_call_events
+Create Date: 2026-10-19 10:00:00.000000
+
+Replaces backend/add_upload_tables.py. Tables that script (or db.create_all())
+already created are kept; upload_jobs gets caller_weights if it predates
+weighted distribution. upload_staging only holds rows while a job runs, so a
+copy without phone_normalized is simply rebuilt.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_upload_tables'
+down_revision = '0005_call_events'
+branch_labels = None
+depends_on = None
+
+
+def get_column_names(inspector, table):
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('upload_staging') and 'phone_normalized' not in get_column_names(inspector, 'upload_staging'):
+        op.drop_table('upload_staging')
+        inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('upload_staging'):
+        op.create_table(
+            'upload_staging',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('batch_id', sa.String(36), nullable=False),
+            sa.Column('seq', sa.Integer(), nullable=False),
+            sa.Column('phone_number', sa.String(20), nullable=False),
+            sa.Column('phone_normalized', sa.String(20), nullable=False),
+            sa.Column('name', sa.String(100))
+        )
+        op.create_index('ix_upload_staging_batch_id', 'upload_staging', ['batch_id'])
+
+    if not inspector.has_table('upload_jobs'):
+        op.create_table(
+            'upload_jobs',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('status', sa.Enum('queued', 'running', 'completed', 'failed', name='upload_job_status')),
+            sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('distribution_type', sa.String(20)),
+            sa.Column('caller_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('caller_weights', sa.Text()),
+            sa.Column('files', sa.Text(), nullable=False),
+            sa.Column('rows_parsed', sa.Integer()),
+            sa.Column('records_added', sa.Integer()),
+            sa.Column('skipped_duplicates', sa.Integer()),
+            sa.Column('file_results', sa.Text()),
+            sa.Column('result', sa.Text()),
+            sa.Column('error', sa.Text()),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('started_at', sa.DateTime()),
+            sa.Column('finished_at', sa.DateTime())
+        )
+    elif 'caller_weights' not in get_column_names(inspector, 'upload_jobs'):
+        with op.batch_alter_table('upload_jobs') as batch_op:
+            batch_op.add_column(sa.Column('caller_weights', sa.Text()))
+
+    if not inspector.has_table('upload_sessions'):
+        op.create_table(
+            'upload_sessions',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('status', sa.Enum('open', 'finalized', name='upload_session_status')),
+            sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('filename', sa.String(255), nullable=False),
+            sa.Column('total_size', sa.BigInteger(), nullable=False),
+            sa.Column('chunk_size', sa.Integer(), nullable=False),
+            sa.Column('total_chunks', sa.Integer(), nullable=False),
+            sa.Column('checksum', sa.String(64)),
+            sa.Column('distribution_type', sa.String(20)),
+            sa.Column('caller_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('caller_weights', sa.Text()),
+            sa.Column('job_id', sa.String(36), sa.ForeignKey('upload_jobs.id'), nullable=True),
+            sa.Column('created_at', sa.DateTime())
+        )
+
+    if not inspector.has_table('upload_fingerprints'):
+        op.create_table(
+            'upload_fingerprints',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('content_hash', sa.String(64), nullable=False),
+            sa.Column('size', sa.BigInteger(), nullable=False),
+            sa.Column('file_ext', sa.String(10), nullable=False),
+            sa.Column('columns', sa.Text()),
+            sa.Column('phone_column', sa.String(255)),
+            sa.Column('name_column', sa.String(255)),
+            sa.Column('rows_parsed', sa.Integer()),
+            sa.Column('records_found', sa.Integer()),
+            sa.Column('job_id', sa.String(36), sa.ForeignKey('upload_jobs.id')),
+            sa.Column('result', sa.Text()),
+            sa.Column('created_at', sa.DateTime())
+        )
+        op.create_index('ix_upload_fingerprints_content_hash', 'upload_fingerprints', ['content_hash'])
+
+
+def downgrade():
+    op.drop_table('upload_fingerprints')
+    op.drop_table('upload_sessions')
+    op.drop_table('upload_jobs')
+    op.drop_table('upload_staging')
@@ -0,0 +1,95 @@
+"""records.phone_normalized with a unique index
+
+Revision ID: 0007_phone_normalized
+Revises: 0006_upload_tables
+Create Date: 2026-10-19 10:20:00.000000
+
+Replaces backend/add_phone_normalized_field.py. Existing rows are backfilled in
+batches with the rules of normalize_phone_numbers (copied here so the revision
+does not change when the app does). Legacy duplicates keep the number only on
+their oldest record, which lets the unique index build; on PostgreSQL it is
+built CONCURRENTLY so records stay writable.
+
+"""
+import re
+
+from alembic import op
+from flask import current_app
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_phone_normalized'
+down_revision = '0006_upload_tables'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def normalize_phone(phone, country_code, national_length):
+    digits = re.sub(r'\D', '', str(phone))
+    if digits.startswith('00'):
+        digits = digits[2:]
+    if len(digits) == national_length + len(country_code) and digits.startswith(country_code):
+        digits = digits[len(country_code):]
+    if len(digits) == national_length + 1 and digits.startswith('0'):
+        digits = digits[1:]
+    return digits if 0 < len(digits) <= 20 else None
+
+
+def upgrade():
+    bind = op.get_bind()
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('records')}
+    if 'phone_normalized' not in columns:
+        with op.batch_alter_table('records') as batch_op:
+            batch_op.add_column(sa.Column('phone_normalized', sa.String(20)))
+
+    country_code = current_app.config['PHONE_COUNTRY_CODE']
+    national_length = current_app.config['PHONE_NATIONAL_LENGTH']
+
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text("""
+            SELECT id, phone_number FROM records
+            WHERE id > :last_id AND phone_normalized IS NULL
+            ORDER BY id
+            LIMIT :limit
+        """), {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for record_id, phone_number in rows:
+            phone = normalize_phone(phone_number, country_code, national_length)
+            if phone:
+                params.append({'id': record_id, 'phone': phone})
+        if params:
+            bind.execute(sa.text("UPDATE records SET phone_normalized = :phone WHERE id = :id"), params)
+        last_id = rows[-1][0]
+
+    # Only the oldest record of each number keeps it
+    op.execute("""
+        UPDATE records SET phone_normalized = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY phone_normalized ORDER BY id) AS position
+                FROM records
+                WHERE phone_normalized IS NOT NULL
+            ) AS numbered
+            WHERE position > 1
+        )
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_records_phone_normalized', 'records', ['phone_normalized'],
+            unique=True, if_not_exists=True, postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_records_phone_normalized', table_name='records', if_exists=True, postgresql_concurrently=True)
+    with op.batch_alter_table('records') as batch_op:
+        batch_op.drop_column('phone_normalized')
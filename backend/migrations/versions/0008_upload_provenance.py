@@ -0,0 +1,48 @@
+"""Link records and fingerprints to the uploads that produced them
+
+Revision ID: 0008_upload_provenance
+Revises: 0007_phone_normalized
+Create Date: 2026-10-19 14:00:00.000000
+
+records.upload_job_id names the upload job that inserted a record and
+upload_fingerprints.previous_id the fingerprint an appended file extended, so
+deleting a record only drops the fingerprints of files it came from. Existing
+fingerprints cannot be tied to their records, so they are dropped; the next
+upload of those files is processed in full once.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_upload_provenance'
+down_revision = '0007_phone_normalized'
+branch_labels = None
+depends_on = None
+
+
+def get_column_names(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if 'upload_job_id' not in get_column_names('records'):
+        with op.batch_alter_table('records') as batch_op:
+            batch_op.add_column(sa.Column('upload_job_id', sa.String(36), nullable=True))
+
+    if 'previous_id' not in get_column_names('upload_fingerprints'):
+        op.execute("DELETE FROM upload_fingerprints")
+        with op.batch_alter_table('upload_fingerprints') as batch_op:
+            batch_op.add_column(sa.Column('previous_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                'fk_upload_fingerprints_previous_id', 'upload_fingerprints', ['previous_id'], ['id']
+            )
+
+
+def downgrade():
+    with op.batch_alter_table('upload_fingerprints') as batch_op:
+        batch_op.drop_constraint('fk_upload_fingerprints_previous_id', type_='foreignkey')
+        batch_op.drop_column('previous_id')
+    with op.batch_alter_table('records') as batch_op:
+        batch_op.drop_column('upload_job_id')
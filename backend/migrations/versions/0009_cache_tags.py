@@ -0,0 +1,35 @@
+"""App cache tag versions
+
+Revision ID: 0009_cache_tags
+Revises: 0008_upload_provenance
+Create Date: 2026-10-19 15:00:00.000000
+
+Without Redis the app cache keeps its entries in each process but reads tag
+versions from this table, so writes committed by the upload worker (or another
+web worker) invalidate every process's cached reports.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_cache_tags'
+down_revision = '0008_upload_provenance'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('cache_tags'):
+        return
+
+    op.create_table(
+        'cache_tags',
+        sa.Column('tag', sa.String(100), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_table('cache_tags')
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Background worker for CSV/Excel uploads.
+Polls the upload_jobs table and processes queued jobs outside the web process.
+
+Usage: python backend/upload_worker.py
+The worker must see the same UPLOAD_SPOOL_DIR as the web process, so every deploy
+target (Procfile, render.yaml, railway.json) starts it in the web container through
+run_with_worker.sh, which exits when either process dies so the platform restarts both.
+Every few minutes it also requeues jobs left running by a crashed worker (after
+UPLOAD_JOB_TIMEOUT seconds) and deletes chunked upload sessions never finalized
+within UPLOAD_SESSION_TTL seconds.
+"""
+import os
+import sys
+import time
+
+# Add parent directory to path to import app
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, claim_upload_job, run_upload_job, reclaim_stale_upload_jobs, expire_upload_sessions
+
+POLL_INTERVAL = float(os.getenv('UPLOAD_WORKER_POLL_INTERVAL', 2))
+CLEANUP_INTERVAL = float(os.getenv('UPLOAD_WORKER_CLEANUP_INTERVAL', 300))
+
+def run_worker():
+    print("🚀 Upload worker started", flush=True)
+    print(f"📁 Spool directory: {app.config['UPLOAD_SPOOL_DIR']}", flush=True)
+    
+    last_cleanup = 0
+    while True:
+        with app.app_context():
+            try:
+                if time.monotonic() - last_cleanup >= CLEANUP_INTERVAL:
+                    last_cleanup = time.monotonic()
+                    reclaim_stale_upload_jobs()
+                    expire_upload_sessions()
+                
+                job = claim_upload_job()
+                if job:
+                    run_upload_job(job)
+                    continue
+            except Exception as e:
+                print(f"❌ Worker error: {e}", flush=True)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+        
+        time.sleep(POLL_INTERVAL)
+
+if __name__ == '__main__':
+    run_worker()
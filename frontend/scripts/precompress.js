@@ -0,0 +1,47 @@
+// Writes .br and .gz copies of the build output next to the originals so the
+// backend can serve them precompressed (see send_frontend_file in backend/app.py).
+// Runs automatically after `npm run build`.
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+
+const BUILD_DIR = path.join(__dirname, '..', 'build');
+const COMPRESSIBLE = /\.(js|css|html|json|svg|txt|map|ico)$/;
+const MIN_SIZE = 1024;
+
+const listFiles = (dir) =>
+  fs.readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+    const fullPath = path.join(dir, entry.name);
+    return entry.isDirectory() ? listFiles(fullPath) : [fullPath];
+  });
+
+const encoders = {
+  '.br': (data) => zlib.brotliCompressSync(data, {
+    params: {
+      [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+      [zlib.constants.BROTLI_PARAM_SIZE_HINT]: data.length
+    }
+  }),
+  '.gz': (data) => zlib.gzipSync(data, { level: zlib.constants.Z_BEST_COMPRESSION })
+};
+
+let originalBytes = 0;
+let compressedBytes = 0;
+
+listFiles(BUILD_DIR)
+  .filter((file) => COMPRESSIBLE.test(file) && fs.statSync(file).size >= MIN_SIZE)
+  .forEach((file) => {
+    const data = fs.readFileSync(file);
+    originalBytes += data.length;
+
+    Object.entries(encoders).forEach(([extension, encode]) => {
+      const compressed = encode(data);
+      // Only keep a copy that is actually smaller
+      if (compressed.length < data.length) {
+        fs.writeFileSync(file + extension, compressed);
+        if (extension === '.br') compressedBytes += compressed.length;
+      }
+    });
+  });
+
+console.log(`Precompressed build: ${(originalBytes / 1024).toFixed(0)} KB -> ${(compressedBytes / 1024).toFixed(0)} KB (brotli)`);
@@ -12,12 +12,14 @@ const CallerDashboard = ({ user, onLogout }) => {
   const [search, setSearch] = useState('');
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  const [pageCursors, setPageCursors] = useState(['']); // cursor that fetches each page
   const [editingRecord, setEditingRecord] = useState(null);
   const [todayProgress, setTodayProgress] = useState(0);
   const [reminderModalRecord, setReminderModalRecord] = useState(null);
   const [reminderQueue, setReminderQueue] = useState([]);
   const [showAlarmPopup, setShowAlarmPopup] = useState(false);
   const [activeTab, setActiveTab] = useState('tasks'); // tasks, alarms, try_again, visited, confirmed, other
+  const [recordCounts, setRecordCounts] = useState({});
 
   useEffect(() => {
     fetchRecords();
@@ -32,7 +34,18 @@ const CallerDashboard = ({ user, onLogout }) => {
     return () => clearInterval(reminderInterval);
   }, [currentPage, search, activeTab]);
 
+  const fetchRecordCounts = async () => {
+    try {
+      const response = await api.get('/caller/record-counts');
+      setRecordCounts(response.data);
+    } catch (error) {
+      console.error('Error fetching record counts:', error);
+    }
+  };
+
   const fetchRecords = async () => {
+    fetchRecordCounts();
+    
     if (activeTab === 'tasks') {
       setLoading(false);
       return; // Tasks are fetched separately
@@ -43,10 +56,18 @@ const CallerDashboard = ({ user, onLogout }) => {
                   activeTab === 'try_again' ? 'try_again' :
                   activeTab === 'visited' ? 'visited' :
                   activeTab === 'confirmed' ? 'confirmed' : 'other';
-      const response = await api.get(`/caller/records?page=${currentPage}&search=${search}&tab=${tab}`);
+      const cursor = encodeURIComponent(pageCursors[currentPage - 1] || '');
+      const response = await api.get(`/caller/records?cursor=${cursor}&include_total=true&search=${search}&tab=${tab}`);
 
       setRecords(response.data.records);
-      setTotalPages(response.data.pages);
+      setPageCursors(cursors => {
+        const updated = cursors.slice(0, currentPage);
+        if (response.data.next_cursor) updated[currentPage] = response.data.next_cursor;
+        return updated;
+      });
+      setTotalPages(response.data.next_cursor ?
+        Math.max(currentPage + 1, Math.ceil(response.data.total / response.data.per_page)) :
+        currentPage);
       setLoading(false);
     } catch (error) {
       console.error('Error fetching records:', error);
@@ -153,17 +174,24 @@ ${user.name}
 
   const handleUpdateRecord = async (recordId, updates) => {
     try {
-      await api.patch(`/records/${recordId}`, updates);
+      const current = records.find(record => record.id === recordId);
+      const response = await api.patch(`/records/${recordId}`, { ...updates, version: current?.version });
 
       // Update local state
       setRecords(records.map(record => 
-        record.id === recordId ? { ...record, ...updates } : record
+        record.id === recordId ? { ...record, ...updates, version: response.data.version } : record
       ));
       
       setEditingRecord(null);
       fetchTodayProgress(); // Refresh progress
     } catch (error) {
       console.error('Error updating record:', error);
+      if (error.response?.status === 409) {
+        // Someone else saved this record first - show their version
+        alert(error.response.data.message);
+        setEditingRecord(null);
+        fetchRecords();
+      }
     }
   };
 
@@ -365,7 +393,7 @@ ${user.name}
                   fontWeight: activeTab === 'alarms' ? 'bold' : 'normal'
                 }}
               >
-                ⏰ With Alarms
+                ⏰ With Alarms{recordCounts.alarms !== undefined && ` (${recordCounts.alarms})`}
               </button>
               <button
                 onClick={() => { setActiveTab('try_again'); setCurrentPage(1); }}
@@ -379,7 +407,7 @@ ${user.name}
                   fontWeight: activeTab === 'try_again' ? 'bold' : 'normal'
                 }}
               >
-                🔄 Try Again
+                🔄 Try Again{recordCounts.try_again !== undefined && ` (${recordCounts.try_again})`}
               </button>
               <button
                 onClick={() => { setActiveTab('visited'); setCurrentPage(1); }}
@@ -393,7 +421,7 @@ ${user.name}
                   fontWeight: activeTab === 'visited' ? 'bold' : 'normal'
                 }}
               >
-                👥 Visited
+                👥 Visited{recordCounts.visited !== undefined && ` (${recordCounts.visited})`}
               </button>
               <button
                 onClick={() => { setActiveTab('confirmed'); setCurrentPage(1); }}
@@ -407,7 +435,7 @@ ${user.name}
                   fontWeight: activeTab === 'confirmed' ? 'bold' : 'normal'
                 }}
               >
-                ✅ Confirmed
+                ✅ Confirmed{recordCounts.confirmed !== undefined && ` (${recordCounts.confirmed})`}
               </button>
               <button
                 onClick={() => { setActiveTab('other'); setCurrentPage(1); }}
@@ -421,7 +449,7 @@ ${user.name}
                   fontWeight: activeTab === 'other' ? 'bold' : 'normal'
                 }}
               >
-                📞 Other Records
+                📞 Other Records{recordCounts.other !== undefined && ` (${recordCounts.other})`}
               </button>
             </div>
           </div>
@@ -443,7 +471,7 @@ ${user.name}
             <div style={{ display: 'flex', gap: '1rem' }}>
               <input
                 type="text"
-                placeholder="Search by phone or name..."
+                placeholder="Search by phone or name (3+ characters)..."
                 value={search}
                 onChange={(e) => setSearch(e.target.value)}
                 className="form-control"
@@ -579,8 +607,8 @@ ${user.name}
                 Page {currentPage} of {totalPages}
               </span>
               <button 
-                onClick={() => setCurrentPage(Math.min(totalPages, currentPage + 1))}
-                disabled={currentPage === totalPages}
+                onClick={() => setCurrentPage(currentPage + 1)}
+                disabled={!pageCursors[currentPage]}
                 className="btn btn-secondary"
               >
                 Next
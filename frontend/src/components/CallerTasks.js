@@ -41,15 +41,21 @@ const CallerTasks = () => {
     }
   };
 
-  const handleStatusChange = async (taskId, newStatus) => {
+  const handleStatusChange = async (taskId, newStatus, version) => {
     try {
       await api.patch(`/caller/tasks/${taskId}`, { 
         status: newStatus,
-        progress: newStatus === 'completed' ? 100 : newStatus === 'in_progress' ? 50 : 0
+        progress: newStatus === 'completed' ? 100 : newStatus === 'in_progress' ? 50 : 0,
+        version
       });
       fetchTasks();
     } catch (error) {
       console.error('Error updating task:', error);
+      if (error.response?.status === 409) {
+        // Someone else changed this task first - show their version
+        alert(error.response.data.message);
+        fetchTasks();
+      }
     }
   };
 
@@ -225,7 +231,7 @@ const CallerTasks = () => {
               <div style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
                 <select
                   value={task.status}
-                  onChange={(e) => handleStatusChange(task.id, e.target.value)}
+                  onChange={(e) => handleStatusChange(task.id, e.target.value, task.version)}
                   style={{
                     padding: '4px 8px',
                     fontSize: '12px',
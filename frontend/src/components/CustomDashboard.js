@@ -47,6 +47,10 @@ const CustomDashboard = ({ user, onLogout }) => {
       setEditingTask(null);
     } catch (error) {
       console.error('Error updating task:', error);
+      if (error.response?.status === 409) {
+        alert(error.response.data.message);
+        fetchDashboardData();
+      }
     }
   };
 
@@ -67,15 +71,20 @@ const CustomDashboard = ({ user, onLogout }) => {
     }
   };
 
-  const completeTask = async (taskId) => {
+  const completeTask = async (taskId, version) => {
     try {
       await api.patch(`/tasks/${taskId}`, { 
         status: 'completed', 
-        progress: 100 
+        progress: 100,
+        version
       });
       fetchDashboardData();
     } catch (error) {
       console.error('Error completing task:', error);
+      if (error.response?.status === 409) {
+        alert(error.response.data.message);
+        fetchDashboardData();
+      }
     }
   };
 
@@ -335,7 +344,7 @@ const CustomDashboard = ({ user, onLogout }) => {
 
                             <div className="task-actions">
                               <button
-                                onClick={() => completeTask(task.id)}
+                                onClick={() => completeTask(task.id, task.version)}
                                 className="btn btn-done"
                                 title="Mark as completed and remove from list"
                               >
@@ -128,14 +128,20 @@ const TaskManager = ({ user, onLogout }) => {
 
   const updateTask = async (taskId, updates) => {
     try {
-      await api.patch(`/tasks/${taskId}`, updates);
+      const current = tasks.find(task => task.id === taskId);
+      const response = await api.patch(`/tasks/${taskId}`, { ...updates, version: current?.version });
 
       setTasks(tasks.map(task => 
-        task.id === taskId ? { ...task, ...updates } : task
+        task.id === taskId ? { ...task, ...updates, version: response.data.version } : task
       ));
       setEditingTask(null);
     } catch (error) {
       console.error('Error updating task:', error);
+      if (error.response?.status === 409) {
+        alert(error.response.data.message);
+        setEditingTask(null);
+        fetchTasks();
+      }
     }
   };
 
@@ -10,12 +10,16 @@ const UploadCSV = ({ onUploadSuccess }) => {
   const [distributionType, setDistributionType] = useState('equal'); // 'equal' or 'single'
   const [selectedCaller, setSelectedCaller] = useState('');
   const [callers, setCallers] = useState([]);
+  const [jobProgress, setJobProgress] = useState(null);
+  const [preview, setPreview] = useState(null);
+  const [previewing, setPreviewing] = useState(false);
 
   const handleFileChange = async (e) => {
     const selectedFiles = Array.from(e.target.files);
     setFiles(selectedFiles);
     setResult(null);
     setError('');
+    setPreview(null);
     
     // Fetch callers when files are selected
     if (selectedFiles.length > 0) {
@@ -60,11 +64,20 @@ const UploadCSV = ({ onUploadSuccess }) => {
       const response = await api.post('/admin/upload', formData, {
         headers: {
           'Content-Type': 'multipart/form-data'
-        }
+        },
+        timeout: 0
       });
 
-      setResult(response.data);
+      // Upload is processed in the background - poll the job until it finishes
+      const job = await waitForUploadJob(response.data.job_id);
+      if (job.status === 'failed') {
+        setError(job.error || 'Upload failed');
+        return;
+      }
+
+      setResult(job.result);
       setFiles([]);
+      setPreview(null);
       setDistributionType('equal');
       setSelectedCaller('');
       if (onUploadSuccess) onUploadSuccess();
@@ -72,6 +85,44 @@ const UploadCSV = ({ onUploadSuccess }) => {
       setError(error.response?.data?.message || 'Upload failed');
     } finally {
       setUploading(false);
+      setJobProgress(null);
+    }
+  };
+
+  const handlePreview = async () => {
+    setPreviewing(true);
+    setError('');
+
+    const formData = new FormData();
+    files.forEach(file => {
+      formData.append('files', file);
+    });
+    formData.append('preview', 'true');
+
+    try {
+      const response = await api.post('/admin/upload', formData, {
+        headers: {
+          'Content-Type': 'multipart/form-data'
+        },
+        timeout: 0
+      });
+      setPreview(response.data);
+    } catch (error) {
+      setError(error.response?.data?.message || 'Preview failed');
+    } finally {
+      setPreviewing(false);
+    }
+  };
+
+  const waitForUploadJob = async (jobId) => {
+    while (true) {
+      const response = await api.get(`/admin/upload/${jobId}`);
+      const job = response.data;
+      setJobProgress(job);
+      if (job.status === 'completed' || job.status === 'failed') {
+        return job;
+      }
+      await new Promise(resolve => setTimeout(resolve, 2000));
     }
   };
 
@@ -87,8 +138,8 @@ const UploadCSV = ({ onUploadSuccess }) => {
           <li><strong>Phone Column:</strong> Any column containing 'phone', 'mobile', 'number', 'contact', 'cell'</li>
           <li><strong>Name Column:</strong> Any column containing 'name', 'customer', 'client', 'person' (optional)</li>
           <li>Smart column detection - no need for exact column names</li>
-          <li>Duplicates will be automatically removed</li>
-          <li>Records equally distributed per file among callers</li>
+          <li>Duplicates will be automatically removed (+91, leading 0 and spaces are ignored when matching numbers)</li>
+          <li>Records distributed among callers so their pending work evens out</li>
         </ul>
       </div>
 
@@ -146,6 +197,21 @@ const UploadCSV = ({ onUploadSuccess }) => {
           </div>
         )}
 
+        {jobProgress && (
+          <div style={{ 
+            marginBottom: '1rem', 
+            padding: '0.5rem',
+            background: '#e8f4fd',
+            borderRadius: '4px'
+          }}>
+            {jobProgress.status === 'queued' ? 'Waiting for upload worker...' : (
+              `Processing... ${jobProgress.rows_parsed} rows parsed, ` +
+              `${jobProgress.records_added} records added, ` +
+              `${jobProgress.skipped_duplicates} duplicates skipped`
+            )}
+          </div>
+        )}
+
         {result && (
           <div style={{ 
             color: '#27ae60', 
@@ -184,7 +250,7 @@ const UploadCSV = ({ onUploadSuccess }) => {
                   {result.file_results.map((fileResult, index) => (
                     <li key={index} style={{ color: fileResult.status === 'success' ? '#27ae60' : '#e74c3c' }}>
                       {fileResult.filename}: {fileResult.status === 'success' ? 
-                        `${fileResult.records_added} records added` : 
+                        (fileResult.unchanged ? 'already uploaded, skipped' : `${fileResult.records_added} records added`) : 
                         fileResult.message
                       }
                     </li>
@@ -229,7 +295,7 @@ const UploadCSV = ({ onUploadSuccess }) => {
                   />
                   <strong>Distribute Equally</strong>
                   <div style={{ marginLeft: '1.5rem', color: '#666', fontSize: '14px' }}>
-                    Records will be distributed equally among all callers
+                    New records go to the callers with the fewest pending records first
                   </div>
                 </label>
                 
@@ -268,6 +334,24 @@ const UploadCSV = ({ onUploadSuccess }) => {
                   </div>
                 )}
               </div>
+
+              {preview && (
+                <div style={{ marginTop: '1.5rem', padding: '0.5rem', background: '#f8f9fa', borderRadius: '4px', fontSize: '14px' }}>
+                  <strong>🔍 Preview{preview.file_results.some(f => f.is_estimate) ? ' (estimated)' : ''}:</strong>
+                  <ul style={{ marginTop: '0.5rem', paddingLeft: '1rem' }}>
+                    {preview.file_results.map((fileResult, index) => (
+                      <li key={index} style={{ color: fileResult.status === 'success' ? '#333' : '#e74c3c' }}>
+                        {fileResult.filename}: {fileResult.status === 'success' ?
+                          `${fileResult.estimated_total_rows} rows, phone column "${fileResult.phone_column}"` +
+                          `${fileResult.name_column ? `, name column "${fileResult.name_column}"` : ''}` +
+                          ` - ~${fileResult.estimated_new_records} new, ~${fileResult.estimated_duplicates} duplicates` :
+                          fileResult.message
+                        }
+                      </li>
+                    ))}
+                  </ul>
+                </div>
+              )}
               
               <div style={{ display: 'flex', gap: '1rem', marginTop: '2rem', justifyContent: 'flex-end' }}>
                 <button
@@ -277,11 +361,20 @@ const UploadCSV = ({ onUploadSuccess }) => {
                     setFiles([]);
                     setDistributionType('equal');
                     setSelectedCaller('');
+                    setPreview(null);
                   }}
                   className="btn btn-secondary"
                 >
                   Cancel
                 </button>
+                <button
+                  type="button"
+                  onClick={handlePreview}
+                  className="btn btn-secondary"
+                  disabled={previewing}
+                >
+                  {previewing ? 'Checking...' : 'Preview'}
+                </button>
                 <button
                   type="button"
                   onClick={handleUpload}
@@ -301,7 +394,7 @@ const UploadCSV = ({ onUploadSuccess }) => {
           className="btn btn-primary"
           disabled={files.length === 0 || uploading}
         >
-          {uploading ? 'Uploading...' : `Upload ${files.length} File${files.length !== 1 ? 's' : ''}`}
+          {uploading ? (jobProgress ? 'Processing...' : 'Uploading...') : `Upload ${files.length} File${files.length !== 1 ? 's' : ''}`}
         </button>
       </form>
 
@@ -8,6 +8,7 @@ const VisitManagement = () => {
   const [loading, setLoading] = useState(true);
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  const [pageCursors, setPageCursors] = useState(['']); // cursor that fetches each page
   const [searchFilters, setSearchFilters] = useState({
     search_name: '',
     search_phone: ''
@@ -58,13 +59,21 @@ const VisitManagement = () => {
   const fetchVisits = async () => {
     try {
       const params = new URLSearchParams({
-        page: currentPage,
+        cursor: pageCursors[currentPage - 1] || '',
+        include_total: 'true',
         ...searchFilters
       });
       
       const response = await api.get(`/admin/visits?${params}`);
       setVisits(response.data.records);
-      setTotalPages(response.data.pages);
+      setPageCursors(cursors => {
+        const updated = cursors.slice(0, currentPage);
+        if (response.data.next_cursor) updated[currentPage] = response.data.next_cursor;
+        return updated;
+      });
+      setTotalPages(response.data.next_cursor ?
+        Math.max(currentPage + 1, Math.ceil(response.data.total / response.data.per_page)) :
+        currentPage);
       setLoading(false);
     } catch (error) {
       console.error('Error fetching visits:', error);
@@ -189,11 +198,16 @@ const VisitManagement = () => {
   const updateAdmission = async (e) => {
     e.preventDefault();
     try {
-      await api.put(`/admin/other-admission/${editingStudent.id}`, editForm);
+      await api.put(`/admin/other-admission/${editingStudent.id}`, { ...editForm, version: editingStudent.version });
       setShowEditModal(false);
       fetchFeesData(); // Refresh data
     } catch (error) {
       console.error('Error updating admission:', error);
+      if (error.response?.status === 409) {
+        alert(error.response.data.message);
+        setShowEditModal(false);
+        fetchFeesData();
+      }
     }
   };
 
@@ -538,8 +552,8 @@ const VisitManagement = () => {
                   Page {currentPage} of {totalPages}
                 </span>
                 <button 
-                  onClick={() => setCurrentPage(Math.min(totalPages, currentPage + 1))}
-                  disabled={currentPage === totalPages}
+                  onClick={() => setCurrentPage(currentPage + 1)}
+                  disabled={!pageCursors[currentPage]}
                   className="btn btn-pagination"
                 >
                   Next →
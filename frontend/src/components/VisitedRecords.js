@@ -6,6 +6,7 @@ const VisitedRecords = ({ onClose, onAdmissionCreated }) => {
   const [loading, setLoading] = useState(true);
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  const [pageCursors, setPageCursors] = useState(['']); // cursor that fetches each page
   const [searchFilters, setSearchFilters] = useState({
     search_name: '',
     search_phone: ''
@@ -29,13 +30,21 @@ const VisitedRecords = ({ onClose, onAdmissionCreated }) => {
   const fetchRecords = async () => {
     try {
       const params = new URLSearchParams({
-        page: currentPage,
+        cursor: pageCursors[currentPage - 1] || '',
+        include_total: 'true',
         ...searchFilters
       });
       
       const response = await api.get(`/admin/visited-records?${params}`);
       setRecords(response.data.records);
-      setTotalPages(response.data.pages);
+      setPageCursors(cursors => {
+        const updated = cursors.slice(0, currentPage);
+        if (response.data.next_cursor) updated[currentPage] = response.data.next_cursor;
+        return updated;
+      });
+      setTotalPages(response.data.next_cursor ?
+        Math.max(currentPage + 1, Math.ceil(response.data.total / response.data.per_page)) :
+        currentPage);
       setLoading(false);
     } catch (error) {
       console.error('Error fetching visited records:', error);
@@ -233,8 +242,8 @@ const VisitedRecords = ({ onClose, onAdmissionCreated }) => {
                   Page {currentPage} of {totalPages}
                 </span>
                 <button 
-                  onClick={() => setCurrentPage(Math.min(totalPages, currentPage + 1))}
-                  disabled={currentPage === totalPages}
+                  onClick={() => setCurrentPage(currentPage + 1)}
+                  disabled={!pageCursors[currentPage]}
                   className="btn btn-pagination"
                 >
                   Next →
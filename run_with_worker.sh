@@ -0,0 +1,19 @@
+#!/bin/bash
+# Runs the given web server command next to the upload worker in one container,
+# so both see the same UPLOAD_SPOOL_DIR. When either process exits the other is
+# stopped and the script exits with its status, letting the platform restart the
+# container instead of serving uploads that no worker will ever process.
+#
+# Usage: bash run_with_worker.sh python wsgi.py
+
+python backend/upload_worker.py &
+"$@" &
+
+trap 'kill $(jobs -p) 2>/dev/null' TERM INT
+
+wait -n
+status=$?
+echo "❌ A process exited with status $status, stopping the container" >&2
+kill $(jobs -p) 2>/dev/null
+wait
+exit $status